@@ -1,19 +1,148 @@
-import openai
 import os
 import json
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Set
 from models import ViralContent, ContentAnalysis, ViralPattern, AffiliateOpportunity, ContentBrief
+import random
+import re
 import uuid
 
+# Keyword tables used by the rule-based fallback analyser. Matching is plain
+# substring matching against the lowercased title, same as `word in title_lower`.
+EMOTIONAL_TRIGGERS = {
+    'curiosity': ['how', 'why', 'what', 'secret', 'truth', 'revealed', 'discover'],
+    'excitement': ['amazing', 'incredible', 'shocking', 'unbelievable', 'breakthrough'],
+    'fear': ['warning', 'danger', 'avoid', 'mistake', 'fail', 'wrong'],
+    'joy': ['happy', 'success', 'win', 'achievement', 'celebration'],
+    'anger': ['outrage', 'scandal', 'exposed', 'lies', 'betrayal']
+}
+
+KEYWORD_TABLES = {
+    'hook_words': ['how', 'why', 'what', 'secret', 'truth'],
+    'power_words': ['shocking', 'amazing', 'incredible', 'unbelievable'],
+    'tech_topic': ['programming', 'ai'],
+    'financial': ['money', 'business', 'success'],
+    'programming': ['programming'],
+    'programming_tools': ['programming', 'coding', 'development'],
+    'ai_tools': ['ai', 'artificial intelligence', 'machine learning'],
+    'business_tools': ['business', 'money', 'success', 'entrepreneur'],
+    'trend_programming': ['programming', 'coding'],
+    'trend_ai': ['ai', 'artificial intelligence'],
+    'trend_business': ['business', 'money', 'success'],
+    **{f'trigger_{emotion}': words for emotion, words in EMOTIONAL_TRIGGERS.items()}
+}
+
+CONTENT_STRUCTURES = {
+    'reddit': ['story-telling', 'problem-solution', 'educational', 'rant'],
+    'youtube': ['tutorial', 'entertainment', 'vlog-style', 'review'],
+    'google': ['informational', 'listicle', 'how-to', 'comparison'],
+    'bing': ['news-style', 'analytical', 'research-based']
+}
+
+CONTENT_ANGLES = {
+    'reddit': ["Personal experience story", "Community discussion starter", "Educational breakdown"],
+    'youtube': ["Tutorial walkthrough", "Behind-the-scenes journey", "Comparison review"],
+    'google': ["Comprehensive guide", "Step-by-step tutorial", "Expert analysis"],
+    'bing': ["News-style coverage", "Research-backed analysis", "Industry insight"]
+}
+
+CALL_TO_ACTIONS = {
+    'reddit': ["Comment your experience below", "Join the discussion in comments", "Share your own tips"],
+    'youtube': ["Subscribe for more tutorials", "Like if this helped you", "Download the free guide"],
+    'google': ["Read the full guide here", "Get the complete toolkit", "Start your free trial"],
+    'bing': ["Learn more about this topic", "Explore related resources", "Get expert consultation"]
+}
+
+CONTENT_OUTLINES = {
+    'problem-solution': [
+        "Hook: Present the problem everyone faces",
+        "Agitate: Explain why this problem matters",
+        "Solution: Introduce your method/tool",
+        "Proof: Show results or evidence",
+        "Action: Clear next steps for readers"
+    ],
+    'tutorial': [
+        "Hook: Promise what they'll learn",
+        "Overview: What you'll cover",
+        "Step-by-step walkthrough",
+        "Common mistakes to avoid",
+        "Next steps and resources"
+    ],
+    'story-telling': [
+        "Hook: Start with compelling moment",
+        "Background: Set the scene",
+        "Journey: What happened",
+        "Lesson: Key takeaway",
+        "Application: How others can use this"
+    ]
+}
+
+BRIEF_NAMESPACE = uuid.UUID('6f1c3f5e-8d4b-4a57-9c39-2f0f8b6f1d2a')
+
+
+class KeywordMatcher:
+    """Matches every keyword table against a text in a single regex pass.
+
+    All keywords are compiled into one longest-first alternation inside a
+    lookahead, so each position reports the longest keyword starting there;
+    shorter keywords that are prefixes of it are added from a lookup table.
+    This gives the same result as testing each keyword with `in`.
+    """
+
+    def __init__(self, tables: Dict[str, List[str]]):
+        self.tables_by_keyword: Dict[str, Set[str]] = {}
+        for table, words in tables.items():
+            for word in words:
+                self.tables_by_keyword.setdefault(word, set()).add(table)
+
+        keywords = sorted(self.tables_by_keyword, key=len, reverse=True)
+        self.prefixes = {
+            keyword: [other for other in keywords if other != keyword and keyword.startswith(other)]
+            for keyword in keywords
+        }
+        self.pattern = re.compile('(?=(' + '|'.join(re.escape(keyword) for keyword in keywords) + '))')
+
+    def match(self, text: str) -> Set[str]:
+        keywords = set()
+        for found in self.pattern.finditer(text):
+            keyword = found.group(1)
+            keywords.add(keyword)
+            keywords.update(self.prefixes[keyword])
+
+        tables = set()
+        for keyword in keywords:
+            tables |= self.tables_by_keyword[keyword]
+        return tables
+
+    def match_batch(self, texts: List[str]) -> List[Set[str]]:
+        return [self.match(text) for text in texts]
+
+
+keyword_matcher = KeywordMatcher(KEYWORD_TABLES)
+
+
 class AIAnalysisService:
     def __init__(self):
-        self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self._client = None
+        self.analysis_count = 0
+        self.brief_count = 0
+
+    @property
+    def client(self):
+        # openai is a heavy import, so it is deferred until a key is configured and used
+        if self._client is None:
+            import openai
+            self._client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return self._client
+
+    def _use_openai(self) -> bool:
+        return bool(os.getenv("OPENAI_API_KEY")) and self.client is not None
 
     def analyze_viral_content(self, content: ViralContent) -> ContentAnalysis:
+        self.analysis_count += 1
         # Use AI if OpenAI key is available, otherwise use enhanced fallback
         try:
-            if self.client and os.getenv("OPENAI_API_KEY"):
+            if self._use_openai():
                 return self._ai_analyze_content(content)
             else:
                 return self._smart_fallback_analysis(content)
@@ -55,46 +184,44 @@ class AIAnalysisService:
         # For now, use smart analysis based on content attributes
         return self._smart_fallback_analysis(content)
 
+    def analyze_batch(self, contents: List[ViralContent]) -> List[ContentAnalysis]:
+        if self._use_openai():
+            return [self.analyze_viral_content(content) for content in contents]
+        self.analysis_count += len(contents)
+        return self._smart_fallback_analysis_batch(contents)
+
     def _smart_fallback_analysis(self, content: ViralContent) -> ContentAnalysis:
-        import random
+        return self._smart_fallback_analysis_batch([content])[0]
+
+    def _smart_fallback_analysis_batch(self, contents: List[ViralContent]) -> List[ContentAnalysis]:
+        matches = keyword_matcher.match_batch([content.title.lower() for content in contents])
+        return [self._fallback_analysis_from_matches(content, matched) for content, matched in zip(contents, matches)]
+
+    def _fallback_analysis_from_matches(self, content: ViralContent, matched: Set[str]) -> ContentAnalysis:
+        # Seeded by content id so the same item always gets the same analysis
+        rng = random.Random(content.id)
 
         # Analyze hook strength based on title characteristics
-        title_lower = content.title.lower()
         hook_strength = 5.0
 
         # Boost for question marks, numbers, power words
         if '?' in content.title: hook_strength += 1.5
-        if any(word in title_lower for word in ['how', 'why', 'what', 'secret', 'truth']): hook_strength += 1.0
+        if 'hook_words' in matched: hook_strength += 1.0
         if any(char.isdigit() for char in content.title): hook_strength += 0.8
-        if any(word in title_lower for word in ['shocking', 'amazing', 'incredible', 'unbelievable']): hook_strength += 1.2
+        if 'power_words' in matched: hook_strength += 1.2
         if content.viral_score > 80: hook_strength += 1.0
         elif content.viral_score > 60: hook_strength += 0.5
 
         hook_strength = min(hook_strength, 10.0)
 
         # Determine emotional trigger based on content
-        triggers = {
-            'curiosity': ['how', 'why', 'what', 'secret', 'truth', 'revealed', 'discover'],
-            'excitement': ['amazing', 'incredible', 'shocking', 'unbelievable', 'breakthrough'],
-            'fear': ['warning', 'danger', 'avoid', 'mistake', 'fail', 'wrong'],
-            'joy': ['happy', 'success', 'win', 'achievement', 'celebration'],
-            'anger': ['outrage', 'scandal', 'exposed', 'lies', 'betrayal']
-        }
-
-        emotional_trigger = 'curiosity'
-        for emotion, words in triggers.items():
-            if any(word in title_lower for word in words):
-                emotional_trigger = emotion
-                break
+        emotional_trigger = next(
+            (emotion for emotion in EMOTIONAL_TRIGGERS if f'trigger_{emotion}' in matched),
+            'curiosity'
+        )
 
         # Content structure based on platform and type
-        structures = {
-            'reddit': ['story-telling', 'problem-solution', 'educational', 'rant'],
-            'youtube': ['tutorial', 'entertainment', 'vlog-style', 'review'],
-            'google': ['informational', 'listicle', 'how-to', 'comparison'],
-            'bing': ['news-style', 'analytical', 'research-based']
-        }
-        content_structure = random.choice(structures.get(content.platform.value, ['standard']))
+        content_structure = rng.choice(CONTENT_STRUCTURES.get(content.platform.value, ['standard']))
 
         # Generate insights based on content analysis
         insights = []
@@ -106,8 +233,8 @@ class AIAnalysisService:
 
         # Generate success factors
         factors = []
-        if 'programming' in title_lower or 'ai' in title_lower: factors.append("Trending tech topic")
-        if any(word in title_lower for word in ['money', 'business', 'success']): factors.append("Financial motivation")
+        if 'tech_topic' in matched: factors.append("Trending tech topic")
+        if 'financial' in matched: factors.append("Financial motivation")
         factors.append("Clear value proposition")
         if content.engagement_metrics.comments > 100: factors.append("Discussion-worthy content")
 
@@ -116,11 +243,11 @@ class AIAnalysisService:
         if content.platform.value != 'youtube': adaptations.append("Create video version")
         if content.platform.value != 'reddit': adaptations.append("Adapt for community discussion")
         adaptations.append("Add personal experience examples")
-        if 'programming' in title_lower: adaptations.append("Include code examples or demos")
+        if 'programming' in matched: adaptations.append("Include code examples or demos")
 
         # Generate affiliate opportunities based on content
         opportunities = []
-        if any(word in title_lower for word in ['programming', 'coding', 'development']):
+        if 'programming_tools' in matched:
             opportunities.append(AffiliateOpportunity(
                 product_category="programming tools",
                 monetization_angle="developer productivity",
@@ -128,7 +255,7 @@ class AIAnalysisService:
                 commission_potential="high",
                 recommended_products=["coding IDEs", "learning platforms", "development tools"]
             ))
-        if any(word in title_lower for word in ['ai', 'artificial intelligence', 'machine learning']):
+        if 'ai_tools' in matched:
             opportunities.append(AffiliateOpportunity(
                 product_category="AI tools",
                 monetization_angle="AI automation",
@@ -136,7 +263,7 @@ class AIAnalysisService:
                 commission_potential="high",
                 recommended_products=["AI platforms", "automation tools", "AI courses"]
             ))
-        if any(word in title_lower for word in ['business', 'money', 'success', 'entrepreneur']):
+        if 'business_tools' in matched:
             opportunities.append(AffiliateOpportunity(
                 product_category="business tools",
                 monetization_angle="business growth",
@@ -158,7 +285,7 @@ class AIAnalysisService:
             hook_strength=hook_strength,
             emotional_trigger=emotional_trigger,
             content_structure=content_structure,
-            timing_factor=random.uniform(6.0, 9.0),
+            timing_factor=rng.uniform(6.0, 9.0),
             audience_appeal="targeted niche" if content.viral_score > 80 else "broad appeal"
         )
 
@@ -172,8 +299,9 @@ class AIAnalysisService:
         )
 
     def generate_content_brief(self, content: ViralContent, analysis: ContentAnalysis) -> ContentBrief:
+        self.brief_count += 1
         try:
-            if self.client and os.getenv("OPENAI_API_KEY"):
+            if self._use_openai():
                 return self._ai_generate_brief(content, analysis)
             else:
                 return self._smart_brief_generation(content, analysis)
@@ -215,41 +343,53 @@ class AIAnalysisService:
         # For now, fall back to smart generation
         return self._smart_brief_generation(content, analysis)
 
+    def generate_brief_batch(self, contents: List[ViralContent], analyses: List[ContentAnalysis]) -> List[ContentBrief]:
+        if self._use_openai():
+            return [self.generate_content_brief(content, analysis) for content, analysis in zip(contents, analyses)]
+        self.brief_count += len(contents)
+        return self._smart_brief_generation_batch(contents, analyses)
+
     def _smart_brief_generation(self, content: ViralContent, analysis: ContentAnalysis) -> ContentBrief:
-        import random
+        return self._smart_brief_generation_batch([content], [analysis])[0]
 
-        title_lower = content.title.lower()
+    def _smart_brief_generation_batch(self, contents: List[ViralContent], analyses: List[ContentAnalysis]) -> List[ContentBrief]:
+        matches = keyword_matcher.match_batch([content.title.lower() for content in contents])
+        return [
+            self._brief_from_matches(content, analysis, matched)
+            for content, analysis, matched in zip(contents, analyses, matches)
+        ]
+
+    def _hook_suggestions(self, title_lower: str, emotional_trigger: str) -> List[str]:
+        words = title_lower.split()
 
         # Generate smart hook suggestions based on emotional trigger
-        hook_templates = {
-            'curiosity': [
-                f"What if I told you {title_lower.replace('how', 'there\'s a way')}?",
-                f"The secret behind {title_lower.split()[1:4] if len(title_lower.split()) > 3 else title_lower.split()}",
-                f"You won't believe what happened when I tried {title_lower.split()[1:3] if len(title_lower.split()) > 2 else 'this method'}"
-            ],
-            'excitement': [
-                f"This {title_lower.split()[1] if len(title_lower.split()) > 1 else 'method'} will blow your mind!",
+        if emotional_trigger == 'excitement':
+            return [
+                f"This {words[1] if len(words) > 1 else 'method'} will blow your mind!",
                 f"BREAKTHROUGH: {title_lower.replace('how', 'new way')}",
-                f"The {title_lower.split()[1:3] if len(title_lower.split()) > 2 else 'amazing'} discovery everyone's talking about"
-            ],
-            'fear': [
-                f"WARNING: Avoid these {title_lower.split()[1:3] if len(title_lower.split()) > 2 else 'mistakes'}",
-                f"Don't make this {title_lower.split()[1] if len(title_lower.split()) > 1 else 'common'} mistake",
+                f"The {words[1:3] if len(words) > 2 else 'amazing'} discovery everyone's talking about"
+            ]
+        if emotional_trigger == 'fear':
+            return [
+                f"WARNING: Avoid these {words[1:3] if len(words) > 2 else 'mistakes'}",
+                f"Don't make this {words[1] if len(words) > 1 else 'common'} mistake",
                 f"Why {title_lower.replace('how', 'most people')} fail (and how to avoid it)"
             ]
-        }
+        curiosity_title = title_lower.replace('how', "there's a way")
+        return [
+            f"What if I told you {curiosity_title}?",
+            f"The secret behind {words[1:4] if len(words) > 3 else words}",
+            f"You won't believe what happened when I tried {words[1:3] if len(words) > 2 else 'this method'}"
+        ]
+
+    def _brief_from_matches(self, content: ViralContent, analysis: ContentAnalysis, matched: Set[str]) -> ContentBrief:
+        # Seeded by content id so the same item always gets the same brief
+        rng = random.Random(f"brief:{content.id}")
 
-        emotional_trigger = analysis.viral_patterns.emotional_trigger
-        hooks = hook_templates.get(emotional_trigger, hook_templates['curiosity'])[:3]
+        hooks = self._hook_suggestions(content.title.lower(), analysis.viral_patterns.emotional_trigger)
 
         # Generate content angles based on platform
-        angle_options = {
-            'reddit': ["Personal experience story", "Community discussion starter", "Educational breakdown"],
-            'youtube': ["Tutorial walkthrough", "Behind-the-scenes journey", "Comparison review"],
-            'google': ["Comprehensive guide", "Step-by-step tutorial", "Expert analysis"],
-            'bing': ["News-style coverage", "Research-backed analysis", "Industry insight"]
-        }
-        angles = angle_options.get(content.platform.value, angle_options['reddit'])
+        angles = CONTENT_ANGLES.get(content.platform.value, CONTENT_ANGLES['reddit'])
 
         # Determine target audience based on content and opportunities
         if any('programming' in opp.product_category for opp in analysis.affiliate_opportunities):
@@ -262,13 +402,7 @@ class AIAnalysisService:
             target_audience = "Digital professionals and content creators looking to improve productivity"
 
         # Generate platform-specific CTAs
-        cta_templates = {
-            'reddit': ["Comment your experience below", "Join the discussion in comments", "Share your own tips"],
-            'youtube': ["Subscribe for more tutorials", "Like if this helped you", "Download the free guide"],
-            'google': ["Read the full guide here", "Get the complete toolkit", "Start your free trial"],
-            'bing': ["Learn more about this topic", "Explore related resources", "Get expert consultation"]
-        }
-        ctas = cta_templates.get(content.platform.value, cta_templates['google'])
+        ctas = CALL_TO_ACTIONS.get(content.platform.value, CALL_TO_ACTIONS['google'])
 
         # Get affiliate products from analysis
         affiliate_products = []
@@ -277,55 +411,31 @@ class AIAnalysisService:
         affiliate_products = affiliate_products[:3] if affiliate_products else ["productivity tools", "online courses", "software solutions"]
 
         # Generate content outline based on structure
-        outlines = {
-            'problem-solution': [
-                "Hook: Present the problem everyone faces",
-                "Agitate: Explain why this problem matters",
-                "Solution: Introduce your method/tool",
-                "Proof: Show results or evidence",
-                "Action: Clear next steps for readers"
-            ],
-            'tutorial': [
-                "Hook: Promise what they'll learn",
-                "Overview: What you'll cover",
-                "Step-by-step walkthrough",
-                "Common mistakes to avoid",
-                "Next steps and resources"
-            ],
-            'story-telling': [
-                "Hook: Start with compelling moment",
-                "Background: Set the scene",
-                "Journey: What happened",
-                "Lesson: Key takeaway",
-                "Application: How others can use this"
-            ]
-        }
         content_structure = analysis.viral_patterns.content_structure
-        outline = outlines.get(content_structure, outlines['problem-solution'])
+        outline = CONTENT_OUTLINES.get(content_structure, CONTENT_OUTLINES['problem-solution'])
 
         # Generate trending topics based on content theme
-        trending_base = []
-        if any(word in title_lower for word in ['programming', 'coding']):
+        if 'trend_programming' in matched:
             trending_base = ["AI coding", "remote work", "tech careers", "programming productivity"]
-        elif any(word in title_lower for word in ['ai', 'artificial intelligence']):
+        elif 'trend_ai' in matched:
             trending_base = ["AI automation", "machine learning", "chatbots", "AI productivity"]
-        elif any(word in title_lower for word in ['business', 'money', 'success']):
+        elif 'trend_business' in matched:
             trending_base = ["digital marketing", "side hustles", "passive income", "business automation"]
         else:
             trending_base = ["productivity", "remote work", "digital tools", "online learning"]
 
         return ContentBrief(
-            id=str(uuid.uuid4()),
+            id=str(uuid.uuid5(BRIEF_NAMESPACE, content.id)),
             original_content_id=content.id,
             title=f"Content Brief: {content.title[:50]}{'...' if len(content.title) > 50 else ''}",
             hook_suggestions=hooks,
-            content_angles=angles,
+            content_angles=list(angles),
             target_audience=target_audience,
-            call_to_actions=ctas,
+            call_to_actions=list(ctas),
             affiliate_products=affiliate_products,
-            content_outline=outline,
+            content_outline=list(outline),
             trending_topics=trending_base,
-            estimated_engagement=content.viral_score * random.uniform(0.7, 0.9),
+            estimated_engagement=content.viral_score * rng.uniform(0.7, 0.9),
             generated_date=datetime.now()
         )
 
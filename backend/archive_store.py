@@ -0,0 +1,123 @@
+import gzip
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+
+def as_datetime(value: Any) -> Optional[datetime]:
+    """Parse a stored date, which is a datetime in memory and a string once saved"""
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+class ContentArchive:
+    """Cold tier for content expired from the hot store.
+
+    Items are appended to gzip'd NDJSON segments named by scrape day
+    (``contents-YYYY-MM-DD.ndjson.gz``). Each segment has an ``.ids`` file
+    listing the ids it holds, so single items can be fetched by scanning ids
+    instead of content. Nothing is read until it is needed, so opening the
+    archive costs the same however much it holds.
+    """
+
+    def __init__(self, directory: str = "archive"):
+        self.directory = directory
+        # Archives written before per-day id files kept one index of every id
+        self.legacy_index_file = os.path.join(directory, "index.json")
+
+    def _segment_path(self, day: str) -> str:
+        return os.path.join(self.directory, f"contents-{day}.ndjson.gz")
+
+    def _ids_path(self, day: str) -> str:
+        return os.path.join(self.directory, f"contents-{day}.ids")
+
+    def _read_ids(self, day: str) -> List[str]:
+        path = self._ids_path(day)
+        if not os.path.exists(path):
+            # Segment written before id files existed; the next append to it writes one
+            return [content["id"] for content in self.iter_contents(date.fromisoformat(day), date.fromisoformat(day))]
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read().splitlines()
+
+    def _write_ids(self, day: str, ids: List[str]):
+        # Replaced atomically so a crash mid-write never leaves a truncated file
+        tmp_file = self._ids_path(day) + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write("".join(f"{content_id}\n" for content_id in ids))
+        os.replace(tmp_file, self._ids_path(day))
+
+    def segment_days(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            name[len("contents-"):-len(".ndjson.gz")]
+            for name in os.listdir(self.directory)
+            if name.startswith("contents-") and name.endswith(".ndjson.gz")
+        )
+
+    def append(self, contents: List[Dict[str, Any]]) -> int:
+        """Append items to their day segments and return how many were written"""
+        if not contents:
+            return 0
+        os.makedirs(self.directory, exist_ok=True)
+
+        by_day: Dict[str, List[Dict[str, Any]]] = {}
+        for content in contents:
+            scraped = as_datetime(content.get("scraped_date")) or datetime.now()
+            by_day.setdefault(scraped.date().isoformat(), []).append(content)
+
+        for day, day_contents in by_day.items():
+            ids = self._read_ids(day) if os.path.exists(self._segment_path(day)) else []
+            # gzip supports appending members, so each compaction adds one member per segment
+            with gzip.open(self._segment_path(day), 'at', encoding='utf-8') as f:
+                for content in day_contents:
+                    f.write(json.dumps(content, default=str) + "\n")
+            self._write_ids(day, ids + [content["id"] for content in day_contents])
+
+        if os.path.exists(self.legacy_index_file):
+            os.remove(self.legacy_index_file)
+        return len(contents)
+
+    def iter_contents(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Iterator[Dict[str, Any]]:
+        for day in self.segment_days():
+            if start_date and day < start_date.isoformat():
+                continue
+            if end_date and day > end_date.isoformat():
+                continue
+            with gzip.open(self._segment_path(day), 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def get(self, content_id: str) -> Optional[Dict[str, Any]]:
+        for day in reversed(self.segment_days()):
+            if content_id not in self._read_ids(day):
+                continue
+            for content in self.iter_contents(date.fromisoformat(day), date.fromisoformat(day)):
+                if content["id"] == content_id:
+                    return content
+        return None
+
+    def search(self, query: Optional[str] = None, start_date: Optional[date] = None,
+               end_date: Optional[date] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        query_lower = (query or "").lower()
+        results = []
+        for content in self.iter_contents(start_date, end_date):
+            if query_lower and not (
+                query_lower in content.get("title", "").lower() or
+                query_lower in (content.get("content_text") or "").lower() or
+                any(query_lower in tag.lower() for tag in content.get("tags", []))
+            ):
+                continue
+            results.append(content)
+            if len(results) >= limit:
+                break
+        return results
+
+    def __len__(self) -> int:
+        return sum(len(self._read_ids(day)) for day in self.segment_days())
@@ -0,0 +1,112 @@
+"""Startup, store and memory benchmarks.
+
+Runs against a synthetic corpus in a temporary directory, so the real store
+is never touched:
+
+    python benchmark.py --items 20000
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def build_corpus(directory: str, items: int):
+    with open(os.path.join(BACKEND_DIR, "viral_content_data.json"), 'r') as f:
+        seed = json.load(f)["contents"]
+
+    contents = []
+    for i in range(items):
+        content = dict(seed[i % len(seed)])
+        content["id"] = str(uuid.uuid4())
+        content["url"] = f"{content['url']}?copy={i}"
+        content["title"] = f"{content['title']} #{i}"
+        contents.append(content)
+
+    with open(os.path.join(directory, "viral_content_data.json"), 'w') as f:
+        json.dump({"contents": contents, "last_updated": None}, f, indent=2, default=str)
+
+
+def run_python(code: str, cwd: str) -> str:
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR, OPENAI_API_KEY=os.getenv("OPENAI_API_KEY", ""))
+    result = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, check=True, capture_output=True, text=True)
+    return result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ""
+
+
+def time_subprocess(code: str, cwd: str, runs: int = 3) -> float:
+    """Best wall-clock time of running code in a fresh interpreter"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        run_python(code, cwd)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def time_in_process(setup: str, statement: str, cwd: str) -> float:
+    """Time a statement inside a fresh interpreter, excluding setup and imports"""
+    code = f"{setup}\nimport time\nstarted = time.perf_counter()\n{statement}\nprint(time.perf_counter() - started)"
+    return float(run_python(code, cwd))
+
+
+def bytes_per_item(build: str, cwd: str, items: int) -> float:
+    """Resident bytes per item of what build leaves in `store`, traced from before the JSON is parsed"""
+    code = (
+        "import gc, json, tracemalloc\nimport content_store\ntracemalloc.start()\n"
+        "with open('viral_content_data.json') as f:\n    data = json.load(f)\n"
+        f"{build}\ndel data\ngc.collect()\nprint(tracemalloc.get_traced_memory()[0])"
+    )
+    return int(run_python(code, cwd)) / items
+
+
+def report(name: str, value: float, unit: str = "s"):
+    print(f"{name:<40} {value:>12.4f} {unit}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=20000, help="synthetic corpus size")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="vca-bench-")
+    try:
+        build_corpus(directory, args.items)
+        print(f"Corpus: {args.items} items in {directory}")
+
+        baseline = time_subprocess("pass", directory)
+        report("interpreter start", baseline)
+        report("import main", time_subprocess("import main", directory) - baseline)
+        report(
+            "import main (openai not imported)",
+            time_subprocess("import sys, main; assert 'openai' not in sys.modules", directory) - baseline
+        )
+
+        setup = "import content_service\nservice = content_service.ContentService()"
+        report("ready, cold (parse JSON, build indexes)", time_in_process(setup, "service.load()", directory))
+        report("ready, warm (snapshot + saved indexes)", time_in_process(setup, "service.load()", directory))
+        report("parse store from snapshot", time_in_process(setup, "service._load_data()", directory))
+        run_python("import os\nos.remove('viral_content_data.snapshot')", directory)
+        report("parse store from JSON", time_in_process(setup, "service._load_data()", directory))
+
+        # Before: the parsed JSON dicts the store used to keep resident.
+        # After: the columnar store built from them.
+        report("memory, dict per item", bytes_per_item("store = data['contents']", directory, args.items), "B/item")
+        report(
+            "memory, columnar store",
+            bytes_per_item("store = content_store.ColumnarContentStore.from_records(data['contents'])", directory, args.items),
+            "B/item"
+        )
+        report("build all ViralContent models", time_in_process(setup + "\nservice.load()", "service.get_all_content()", directory))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+# Deltas kept for resuming clients; older cursors get a reset instead
+MAX_VERSIONS = 256
+
+
+def sse_event(event: str, data: bytes, event_id: Optional[str] = None) -> bytes:
+    """Frame a single-line JSON payload as a server-sent event"""
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event}\ndata: ".encode("utf-8") + data + b"\n\n"
+
+
+class ChangeFeed:
+    """Per-version deltas of the hot store for push clients.
+
+    Every ingest or compaction publishes the items it added, updated or removed
+    under the store version it produced. Cursors are ``"<epoch>.<version>"``
+    where the epoch changes on every process start, so a client resuming with a
+    cursor from an earlier process (or one older than the retained deltas) is
+    told to reload instead of silently missing changes.
+    """
+
+    def __init__(self, max_versions: int = MAX_VERSIONS):
+        self.epoch = f"{int(time.time() * 1000):x}"
+        self.version = 0
+        self.deltas: Deque[Dict[str, Any]] = deque(maxlen=max_versions)
+        self.lock = threading.Lock()
+
+    def cursor(self, version: Optional[int] = None) -> str:
+        return f"{self.epoch}.{self.version if version is None else version}"
+
+    def parse_cursor(self, cursor: Optional[str]) -> Optional[int]:
+        """Return the version of a cursor issued by this process, or None"""
+        epoch, _, version = (cursor or "").strip().partition(".")
+        if epoch != self.epoch or not version.isdigit():
+            return None
+        return int(version)
+
+    def publish(self, version: int, added: Optional[List[Dict[str, Any]]] = None,
+                updated: Optional[List[Dict[str, Any]]] = None, removed: Optional[List[str]] = None):
+        delta = {
+            "version": version,
+            "added": added or [],
+            "updated": updated or [],
+            "removed": removed or []
+        }
+        with self.lock:
+            self.deltas.append(delta)
+            self.version = version
+
+    def since(self, version: int) -> Optional[List[Dict[str, Any]]]:
+        """Deltas after version in order, or None when they are no longer retained"""
+        with self.lock:
+            if version > self.version:
+                return None
+            if version == self.version:
+                return []
+            if not self.deltas or self.deltas[0]["version"] > version + 1:
+                return None
+            return [delta for delta in self.deltas if delta["version"] > version]
@@ -1,27 +1,292 @@
 import json
 import uuid
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-from scraper import Scraper
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Callable, Iterator, Optional, Tuple
 from models import ViralContent, Platform, ContentType, EngagementMetrics, ScrapingRequest
+from archive_store import ContentArchive, as_datetime
+from trend_stats import TrendAggregates
+from content_store import ColumnarContentStore
+from change_feed import ChangeFeed
+from contextlib import contextmanager
+import pickle
 import re
 import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Bumped when the pickled indexes change shape; older snapshots keep their store but rebuild the dedup index
+SNAPSHOT_FORMAT = 2
 
 class ContentService:
+    # Store state is built on first access (or by load()) so importing the API stays cheap
+    _LAZY_ATTRIBUTES = {"store", "last_updated", "dedup_index", "vector_index", "trend_stats"}
+
     def __init__(self):
-        self.scraper = Scraper()
+        self._scraper = None
         self.storage_file = "viral_content_data.json"
-        self.content_data = self._load_data()
+        self.snapshot_file = "viral_content_data.snapshot"
+        # Every API worker keeps its own copy of the store; writers serialise on this
+        # file and followers reload whenever another worker replaced the snapshot
+        self.lock_file = "viral_content_data.lock"
+        self._synced_signature: Optional[Tuple[int, int]] = None
+        # Bumped on every ingest so cached responses can be invalidated cheaply
+        self.version = 0
+        self.ready = False
+        # Optional pipeline stages called with the newly stored contents after each ingest
+        self.post_ingest_hooks: List[Callable[[List[ViralContent]], None]] = []
+        # Called with the ids whose metrics or viral score changed, so derived caches can drop them
+        self.update_hooks: List[Callable[[List[str]], None]] = []
+        # Added, updated and removed items per version for push clients
+        self.change_feed = ChangeFeed()
+        self.load_seconds: Optional[float] = None
+        self._load_lock = threading.RLock()
+        # Ingest, compaction and reloads run on worker threads; they take turns replacing the store
+        self._write_lock = threading.RLock()
+
+        # Retention: items older than retention_days move to the cold archive
+        # unless their viral score is above retention_keep_score
+        self.archive = ContentArchive("archive")
+        self.retention_days = int(os.getenv("RETENTION_DAYS", "30"))
+        self.retention_keep_score = float(os.getenv("RETENTION_KEEP_SCORE", "90"))
+        self.retention_max_items = int(os.getenv("RETENTION_MAX_ITEMS", "0"))
+
+    @property
+    def scraper(self):
+        # requests is only imported once something is actually scraped
+        if self._scraper is None:
+            from scraper import Scraper
+            self._scraper = Scraper()
+        return self._scraper
+
+    def __getattr__(self, name: str):
+        if name in ContentService._LAZY_ATTRIBUTES:
+            self.load()
+            return self.__dict__[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def load(self):
+        """Load the store and build its indexes; safe to call from several threads"""
+        with self._load_lock:
+            if self.ready:
+                return
+            started = time.perf_counter()
+
+            # numpy and the indexes are only needed once the store is loaded
+            from vector_index import VectorIndex
+
+            with self._file_lock():
+                store, last_updated, dedup_index, trend_stats, from_snapshot = self._read_store()
+                vector_index = VectorIndex("vector_index.npy")
+                self._embed_contents(store, vector_index=vector_index)
+
+                self.store = store
+                self.last_updated = last_updated
+                self.dedup_index = dedup_index
+                self.trend_stats = trend_stats
+                self.vector_index = vector_index
+                self._synced_signature = self._snapshot_signature()
+                if not from_snapshot:
+                    # Write a snapshot so the next start skips JSON parsing and rebuilding the indexes
+                    try:
+                        self._save_snapshot()
+                    except OSError as e:
+                        print(f"Error writing snapshot {self.snapshot_file}: {e}")
+
+            self.load_seconds = time.perf_counter() - started
+            self.ready = True
+            print(f"Loaded {len(store)} contents in {self.load_seconds:.3f}s")
+
+    def _read_store(self) -> Tuple[ColumnarContentStore, Optional[str], Any, TrendAggregates, bool]:
+        """Read the saved store and build whichever indexes the snapshot did not carry"""
+        store, last_updated, dedup_index, trend_stats = self._load_data()
+        from_snapshot = dedup_index is not None
+        if dedup_index is None:
+            dedup_index = self._build_dedup_index(store)
+        if trend_stats is None:
+            trend_stats = TrendAggregates()
+            for content in store:
+                trend_stats.add(content)
+        trend_stats.refresh()
+        return store, last_updated, dedup_index, trend_stats, from_snapshot
+
+    def _snapshot_signature(self) -> Optional[Tuple[int, int]]:
+        # The snapshot is replaced atomically, so a new inode or mtime means another save
+        try:
+            stat = os.stat(self.snapshot_file)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    @contextmanager
+    def _file_lock(self):
+        """Advisory lock shared by every worker process using this data directory"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_file, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _exclusive(self):
+        """Serialise store writers across threads and worker processes.
+
+        Each write starts from the latest saved store, so one worker's ingest
+        never overwrites what another worker saved in the meantime.
+        """
+        # Loading first keeps the lazy load from running while the write lock is held
+        self.load()
+        with self._write_lock, self._file_lock():
+            self._sync_locked()
+            yield
+
+    def sync_from_disk(self) -> bool:
+        """Adopt a store another worker process saved; returns whether anything was reloaded"""
+        # A store that is not loaded yet reads the latest files when it loads
+        if not self.ready or self._snapshot_signature() in (None, self._synced_signature):
+            return False
+        with self._write_lock, self._file_lock():
+            return self._sync_locked()
+
+    def _sync_locked(self) -> bool:
+        signature = self._snapshot_signature()
+        if signature is None or signature == self._synced_signature:
+            return False
+        from vector_index import VectorIndex
+
+        previous = self.store
+        store, last_updated, dedup_index, trend_stats, _ = self._read_store()
+        added = [row for row, content_id in enumerate(store.ids) if content_id not in previous]
+        removed = [content_id for content_id in previous.ids if content_id not in store]
+        updated = []
+        for row, content_id in enumerate(store.ids):
+            previous_row = previous.row(content_id)
+            if previous_row is not None and (
+                previous.viral_scores[previous_row] != store.viral_scores[row] or
+                previous.metrics(previous_row) != store.metrics(row)
+            ):
+                updated.append(row)
+
+        self.store = store
+        self.last_updated = last_updated
+        self.dedup_index = dedup_index
+        self.trend_stats = trend_stats
+        # The writer also extended the shared vector and archive files
+        self.vector_index = VectorIndex("vector_index.npy")
+        self.archive = ContentArchive("archive")
+        self._synced_signature = signature
+        self.version += 1
+        self.change_feed.publish(
+            self.version,
+            added=[store.record(row) for row in added],
+            updated=[store.record(row) for row in updated],
+            removed=removed
+        )
+        self._run_update_hooks([store.ids[row] for row in updated])
+        print(f"Reloaded store saved by another worker: {len(added)} added, {len(updated)} updated, {len(removed)} removed")
+        return True
+
+    def _run_update_hooks(self, content_ids: List[str]):
+        if not content_ids:
+            return
+        for hook in self.update_hooks:
+            try:
+                hook(content_ids)
+            except Exception as e:
+                print(f"Error in update hook {hook}: {e}")
+
+    def _load_data(self) -> Tuple[ColumnarContentStore, Optional[str], Any, Optional[TrendAggregates]]:
+        """Return the stored contents and their last update, plus the built near-duplicate index
+        and trend rollups when read from a snapshot"""
+        # Prefer the binary snapshot when it is at least as new as the JSON file
+        if os.path.exists(self.snapshot_file) and (
+            not os.path.exists(self.storage_file) or
+            os.path.getmtime(self.snapshot_file) >= os.path.getmtime(self.storage_file)
+        ):
+            try:
+                with open(self.snapshot_file, 'rb') as f:
+                    snapshot = pickle.load(f)
+                dedup_index = snapshot["dedup_index"] if snapshot.get("format") == SNAPSHOT_FORMAT else None
+                return snapshot["store"], snapshot["last_updated"], dedup_index, snapshot["trend_stats"]
+            except Exception as e:
+                print(f"Error loading snapshot {self.snapshot_file}, falling back to JSON: {e}")
 
-    def _load_data(self) -> Dict[str, Any]:
         if os.path.exists(self.storage_file):
             with open(self.storage_file, 'r') as f:
-                return json.load(f)
-        return {"contents": [], "last_updated": None}
+                data = json.load(f)
+            return ColumnarContentStore.from_records(data["contents"]), data.get("last_updated"), None, None
+        return ColumnarContentStore(), None, None, None
+
+    def _build_dedup_index(self, store: ColumnarContentStore, fingerprints: Optional[Dict[str, int]] = None):
+        from dedup_index import NearDuplicateIndex
+
+        dedup_index = NearDuplicateIndex()
+        for row, content_id in enumerate(store.ids):
+            dedup_index.add(
+                content_id,
+                store.titles[row],
+                store.content_texts[row],
+                store.viral_scores[row],
+                fingerprint=fingerprints.get(content_id) if fingerprints else None
+            )
+        return dedup_index
+
+    def _rebuild_dedup_index(self):
+        # Reuse the known fingerprints so only the clustering is redone
+        self.dedup_index = self._build_dedup_index(self.store, self.dedup_index.fingerprints)
+
+    def _embed_contents(self, store: ColumnarContentStore, rows: Optional[List[int]] = None, vector_index=None,
+                        batch_size: int = 1024):
+        if vector_index is None:
+            vector_index = self.vector_index
+        pending = [row for row in (range(len(store)) if rows is None else rows) if store.ids[row] not in vector_index]
+        for start in range(0, len(pending), batch_size):
+            vector_index.add_batch([
+                (store.ids[row], store.titles[row], store.content_texts[row], store.tags(row))
+                for row in pending[start:start + batch_size]
+            ])
+        if pending:
+            vector_index.flush()
+
+    def _select_rows(self, store: ColumnarContentStore, platform: Optional[Platform] = None,
+                     min_viral_score: Optional[float] = None, dedupe: bool = False) -> List[int]:
+        """Rows matching the filters, evaluated on the columns without building models"""
+        rows = range(len(store))
+        if platform:
+            code = store.platform_code(platform)
+            rows = [row for row in rows if store.platforms[row] == code]
+        if min_viral_score is not None and min_viral_score > 0:
+            rows = [row for row in rows if store.viral_scores[row] >= min_viral_score]
+        if dedupe:
+            rows = [row for row in rows if self.dedup_index.is_canonical(store.ids[row])]
+        return list(rows)
 
     def _save_data(self):
         with open(self.storage_file, 'w') as f:
-            json.dump(self.content_data, f, indent=2, default=str)
+            json.dump({"contents": list(self.store), "last_updated": self.last_updated}, f, indent=2, default=str)
+        self._save_snapshot()
+
+    def _save_snapshot(self):
+        snapshot = {
+            "format": SNAPSHOT_FORMAT,
+            "store": self.store,
+            "last_updated": self.last_updated,
+            "dedup_index": self.dedup_index,
+            "trend_stats": self.trend_stats
+        }
+        tmp_file = self.snapshot_file + ".tmp"
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, self.snapshot_file)
+        self._synced_signature = self._snapshot_signature()
 
     def _calculate_viral_score(self, metrics: EngagementMetrics) -> float:
         total_engagement = (
@@ -108,6 +373,14 @@ class ContentService:
 
 
     def scrape_trending_content(self, request: ScrapingRequest) -> List[ViralContent]:
+        return self.scrape_and_ingest(request)[0]
+
+    def scrape_and_ingest(self, request: ScrapingRequest) -> Tuple[List[ViralContent], List[ViralContent]]:
+        """Scrape and store content, returning the top scraped items and the ones that were new.
+
+        Scheduled jobs for different sources run concurrently, so each reads its
+        own yield from the return value rather than from shared state.
+        """
         all_contents = []
         successful_scrapes = 0
 
@@ -156,46 +429,206 @@ class ContentService:
 
         all_contents.sort(key=lambda x: x.viral_score, reverse=True)
 
-        # Save the new content (merge with existing)
-        existing_contents = [ViralContent(**content) for content in self.content_data["contents"]]
-
-        # Remove duplicates by URL and add new content
-        existing_urls = {content.url for content in existing_contents}
-        new_contents = [content for content in all_contents if content.url not in existing_urls]
+        with self._exclusive():
+            new_contents = self._ingest(all_contents)
 
-        all_stored_contents = existing_contents + new_contents
-        all_stored_contents.sort(key=lambda x: x.viral_score, reverse=True)
-
-        self.content_data["contents"] = [content.dict() for content in all_stored_contents]
-        self.content_data["last_updated"] = datetime.now().isoformat()
+        for hook in self.post_ingest_hooks:
+            try:
+                hook(new_contents)
+            except Exception as e:
+                print(f"Error in post-ingest hook {hook}: {e}")
+
+        return all_contents[:request.limit], new_contents
+
+    def _ingest(self, all_contents: List[ViralContent]) -> List[ViralContent]:
+        """Merge scraped contents into the store and return the ones that were new"""
+        # Save the new content (merge with existing). Ingest builds a new store
+        # rather than mutating the one readers may be iterating.
+        merged = self.store.take(range(len(self.store)))
+
+        # Remove duplicates by URL and add new content; re-scraped URLs refresh
+        # the stored engagement metrics and viral score instead
+        existing_rows = {url: row for row, url in enumerate(merged.urls)}
+        new_contents = [content for content in all_contents if content.url not in existing_rows]
+        updated_ids = set()
+        for content in all_contents:
+            row = existing_rows.get(content.url)
+            if row is None or merged.ids[row] in updated_ids:
+                continue
+            metrics = {field: value or 0 for field, value in content.engagement_metrics.dict().items()}
+            if merged.viral_scores[row] == (content.viral_score or 0.0) and merged.metrics(row) == metrics:
+                continue
+            self.trend_stats.remove(merged.record(row))
+            merged.set_engagement(row, content.engagement_metrics, content.viral_score)
+            self.dedup_index.update_score(merged.ids[row], content.viral_score)
+            self.trend_stats.add(merged.record(row))
+            updated_ids.add(merged.ids[row])
+
+        # Cluster near-duplicates (same story across subreddits or search engines)
+        for content in new_contents:
+            canonical_id = self.dedup_index.add(content.id, content.title, content.content_text, content.viral_score)
+            if canonical_id != content.id:
+                print(f"Near-duplicate content {content.id} clustered under {canonical_id}")
+
+        merged.extend(content.dict() for content in new_contents)
+        self.store = merged.sorted_by_score()
+        self.last_updated = datetime.now().isoformat()
+        new_rows = [self.store.row(content.id) for content in new_contents]
+        for row in new_rows:
+            self.trend_stats.add(self.store.record(row))
+        self.trend_stats.refresh()
+
+        # Indexes are updated first so the snapshot written here matches the store
         self._save_data()
+        self.version += 1
+        self.change_feed.publish(
+            self.version,
+            added=[self.store.record(row) for row in new_rows],
+            updated=[self.store.record(self.store.row(content_id)) for content_id in updated_ids]
+        )
+        self._run_update_hooks(list(updated_ids))
+
+        self._embed_contents(self.store, new_rows)
+        return new_contents
+
+    def _is_expired(self, store: ColumnarContentStore, row: int, cutoff: datetime) -> bool:
+        if store.viral_scores[row] > self.retention_keep_score:
+            return False
+        scraped = store.scraped_date(row)
+        return scraped is not None and scraped < cutoff
+
+    def compact(self, now: Optional[datetime] = None) -> int:
+        """Move expired content to the cold archive and return how many items moved"""
+        with self._exclusive():
+            return self._compact(now)
+
+    def _compact(self, now: Optional[datetime] = None) -> int:
+        cutoff = (now or datetime.now()) - timedelta(days=self.retention_days)
+        store = self.store
+        hot, expired = [], []
+        for row in range(len(store)):
+            (expired if self._is_expired(store, row, cutoff) else hot).append(row)
+
+        # Hard cap on the hot tier: contents are kept sorted by viral score
+        if self.retention_max_items and len(hot) > self.retention_max_items:
+            expired.extend(hot[self.retention_max_items:])
+            hot = hot[:self.retention_max_items]
+
+        if not expired:
+            return 0
+
+        expired = [store.record(row) for row in expired]
+        self.archive.append(expired)
+        # Re-interning drops authors and tags only archived items used
+        self.store = store.take(hot, reintern=True)
+        self.last_updated = datetime.now().isoformat()
+        self._rebuild_dedup_index()
+        for content in expired:
+            self.trend_stats.remove(content)
+        self.trend_stats.refresh()
 
-        return all_contents[:request.limit]
-
-    def get_all_content(self) -> List[ViralContent]:
-        return [ViralContent(**content) for content in self.content_data["contents"]]
-
-    def get_content_by_platform(self, platform: Platform) -> List[ViralContent]:
-        return [
-            ViralContent(**content)
-            for content in self.content_data["contents"]
-            if content["platform"] == platform
-        ]
-
-    def search_content(self, query: str) -> List[ViralContent]:
+        self._save_data()
+        self.version += 1
+        self.change_feed.publish(self.version, removed=[content["id"] for content in expired])
+
+        # The vector matrix is append-only, so rebuild it once dead rows dominate. The
+        # new index is built beside the live one, which keeps serving until the swap.
+        if len(self.vector_index) > 2 * len(hot):
+            from vector_index import VectorIndex
+
+            rebuilt = VectorIndex(os.path.splitext(self.vector_index.path)[0] + ".rebuild.npy")
+            self._embed_contents(self.store, vector_index=rebuilt)
+            rebuilt.flush()
+            rebuilt.move_to(self.vector_index.path)
+            self.vector_index = rebuilt
+
+        print(f"Archived {len(expired)} contents, {len(hot)} remain in the hot store")
+        return len(expired)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.trend_stats.current_summary(), "last_updated": self.last_updated}
+
+    def get_archived_content(self, content_id: str) -> Optional[ViralContent]:
+        content = self.archive.get(content_id)
+        return ViralContent(**content) if content else None
+
+    def search_archive(self, query: Optional[str] = None, start_date: Optional[date] = None,
+                       end_date: Optional[date] = None, limit: int = 100) -> List[ViralContent]:
+        return [ViralContent(**content) for content in self.archive.search(query, start_date, end_date, limit)]
+
+    def iter_contents(self, platform: Optional[Platform] = None, min_viral_score: Optional[float] = None,
+                      dedupe: bool = False, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                      include_archive: bool = False) -> Iterator[Dict[str, Any]]:
+        """Yield stored content dicts matching the filters without building models"""
+        # Ingest and compaction replace the store rather than mutating it, so this reference stays consistent
+        store = self.store
+        for row in self._select_rows(store, platform, min_viral_score, dedupe):
+            if (start_date or end_date) and not self._in_date_range(store.scraped_date(row), start_date, end_date):
+                continue
+            yield store.record(row)
+
+        if not include_archive:
+            return
+        # Archived items are only deduplicated against the hot index, which is bounded
+        # by retention; tracking yielded archived rows would grow with the archive
+        for content in self.archive.iter_contents(start_date, end_date):
+            if platform and content.get("platform") != platform:
+                continue
+            if min_viral_score is not None and min_viral_score > 0 and (content.get("viral_score") or 0.0) < min_viral_score:
+                continue
+            if (start_date or end_date) and not self._in_date_range(as_datetime(content.get("scraped_date")), start_date, end_date):
+                continue
+            if dedupe and self.dedup_index.find_duplicates(content.get("title", ""), content.get("content_text", "")):
+                continue
+            yield content
+
+    def _in_date_range(self, scraped: Optional[datetime], start_date: Optional[date], end_date: Optional[date]) -> bool:
+        if scraped is None:
+            return False
+        if start_date and scraped.date() < start_date:
+            return False
+        if end_date and scraped.date() > end_date:
+            return False
+        return True
+
+    def get_all_content(self, dedupe: bool = False) -> List[ViralContent]:
+        store = self.store
+        return store.models(self._select_rows(store, dedupe=dedupe))
+
+    def filter_content(self, platform: Optional[Platform] = None, min_viral_score: Optional[float] = None,
+                       dedupe: bool = False) -> List[ViralContent]:
+        store = self.store
+        return store.models(self._select_rows(store, platform, min_viral_score, dedupe))
+
+    def get_content_by_platform(self, platform: Platform, dedupe: bool = False) -> List[ViralContent]:
+        return self.filter_content(platform, dedupe=dedupe)
+
+    def search_content(self, query: str, dedupe: bool = False) -> List[ViralContent]:
         query_lower = query.lower()
-        matching_contents = []
-
-        for content_dict in self.content_data["contents"]:
-            content = ViralContent(**content_dict)
-            if (query_lower in content.title.lower() or
-                query_lower in (content.content_text or '').lower() or
-                any(query_lower in tag.lower() for tag in content.tags)):
-                matching_contents.append(content)
-
-        return matching_contents
-
-    def get_top_viral_content(self, limit: int = 10) -> List[ViralContent]:
-        all_content = self.get_all_content()
-        sorted_content = sorted(all_content, key=lambda x: x.viral_score, reverse=True)
-        return sorted_content[:limit]
\ No newline at end of file
+        store = self.store
+        matching_rows = [
+            row for row in self._select_rows(store, dedupe=dedupe)
+            if (query_lower in store.titles[row].lower() or
+                query_lower in store.content_texts[row].lower() or
+                any(query_lower in tag.lower() for tag in store.tags(row)))
+        ]
+        return store.models(matching_rows)
+
+    def get_top_viral_content(self, limit: int = 10, dedupe: bool = False) -> List[ViralContent]:
+        store = self.store
+        rows = sorted(self._select_rows(store, dedupe=dedupe), key=store.viral_scores.__getitem__, reverse=True)
+        return store.models(rows[:limit])
+
+    def get_content_by_id(self, content_id: str) -> Optional[ViralContent]:
+        store = self.store
+        row = store.row(content_id)
+        return store.model(row) if row is not None else None
+
+    def find_similar_content(self, content_id: str, k: int = 10) -> List[ViralContent]:
+        store = self.store
+        # Rows of archived items stay in the vector index until it is rebuilt
+        rows = [store.row(similar_id) for similar_id, _ in self.vector_index.similar(content_id, k, include=store.__contains__)]
+        return store.models(row for row in rows if row is not None)
+
+    def get_duplicate_cluster(self, content_id: str) -> List[str]:
+        return self.dedup_index.cluster_members(content_id)
@@ -0,0 +1,223 @@
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from models import ViralContent, Platform, ContentType, EngagementMetrics
+from archive_store import as_datetime
+
+PLATFORMS = list(Platform)
+CONTENT_TYPES = list(ContentType)
+COUNT_FIELDS = ("views", "likes", "comments", "shares", "upvotes", "downvotes")
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+# Stored in place of a missing date
+NO_DATE = -(2 ** 63)
+
+
+def _encode_date(value: Any) -> int:
+    parsed = as_datetime(value)
+    if parsed is None:
+        return NO_DATE
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return (parsed - _EPOCH) // _MICROSECOND
+
+
+def _decode_date(value: int) -> Optional[datetime]:
+    return None if value == NO_DATE else _EPOCH + value * _MICROSECOND
+
+
+class StringTable:
+    """Interns repeated strings (authors, tags, thumbnails) as small integer codes"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def intern(self, value: Optional[str]) -> int:
+        value = value or ""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    # Only the values are pickled; the reverse lookup is rebuilt on load
+    def __getstate__(self):
+        return self.values
+
+    def __setstate__(self, values: List[str]):
+        self.values = values
+        self.codes = {value: code for code, value in enumerate(values)}
+
+
+class ColumnarContentStore:
+    """Hot store kept as one column per field instead of one dict per item.
+
+    Counts, rates, scores and timestamps live in typed arrays, platform and
+    content type are one-byte codes, and authors, tags (which hold the
+    subreddit for Reddit) and thumbnails are codes into a shared StringTable.
+    Rows are only turned into dicts or ``ViralContent`` models when a caller
+    asks for them. Ingest and compaction build a new store with take() instead
+    of reordering one that readers may be iterating.
+    """
+
+    def __init__(self, strings: Optional[StringTable] = None):
+        self.strings = strings if strings is not None else StringTable()
+        self.ids: List[str] = []
+        self.titles: List[str] = []
+        self.urls: List[str] = []
+        self.content_texts: List[str] = []
+        self.authors = array('I')
+        self.thumbnails = array('I')
+        # Row i's tags are tag_codes[tag_offsets[i]:tag_offsets[i + 1]]
+        self.tag_codes = array('I')
+        self.tag_offsets = array('q', [0])
+        self.platforms = array('B')
+        self.content_types = array('B')
+        self.published = array('q')
+        self.scraped = array('q')
+        self.counts = {field: array('q') for field in COUNT_FIELDS}
+        self.engagement_rates = array('d')
+        self.viral_scores = array('d')
+        self.row_by_id: Dict[str, int] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "ColumnarContentStore":
+        store = cls()
+        store.extend(records)
+        return store
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, content_id: str) -> bool:
+        return content_id in self.row_by_id
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in range(len(self.ids)):
+            yield self.record(row)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state["row_by_id"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self.row_by_id = {content_id: row for row, content_id in enumerate(self.ids)}
+
+    def append(self, record: Dict[str, Any]):
+        """Add a content dict, as produced by ViralContent.dict() or read back from JSON"""
+        metrics = record.get("engagement_metrics") or {}
+        if isinstance(metrics, EngagementMetrics):
+            metrics = metrics.dict()
+        intern = self.strings.intern
+
+        self.row_by_id[record["id"]] = len(self.ids)
+        self.ids.append(record["id"])
+        self.titles.append(record.get("title", ""))
+        self.urls.append(record.get("url", ""))
+        self.content_texts.append(record.get("content_text") or "")
+        self.authors.append(intern(record.get("author")))
+        self.thumbnails.append(intern(record.get("thumbnail_url")))
+        self.tag_codes.extend(intern(tag) for tag in record.get("tags") or [])
+        self.tag_offsets.append(len(self.tag_codes))
+        self.platforms.append(PLATFORMS.index(Platform(record["platform"])))
+        self.content_types.append(CONTENT_TYPES.index(ContentType(record["content_type"])))
+        self.published.append(_encode_date(record.get("published_date")))
+        self.scraped.append(_encode_date(record.get("scraped_date")))
+        for field in COUNT_FIELDS:
+            self.counts[field].append(metrics.get(field) or 0)
+        self.engagement_rates.append(metrics.get("engagement_rate") or 0.0)
+        self.viral_scores.append(record.get("viral_score") or 0.0)
+
+    def extend(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.append(record)
+
+    def take(self, rows: Sequence[int], reintern: bool = False) -> "ColumnarContentStore":
+        """New store holding the given rows in order.
+
+        The string table is shared unless ``reintern`` is set, which drops
+        strings no remaining row refers to (used after compaction).
+        """
+        store = ColumnarContentStore(StringTable() if reintern else self.strings)
+        remap = (lambda code: store.strings.intern(self.strings[code])) if reintern else (lambda code: code)
+
+        store.ids = [self.ids[row] for row in rows]
+        store.titles = [self.titles[row] for row in rows]
+        store.urls = [self.urls[row] for row in rows]
+        store.content_texts = [self.content_texts[row] for row in rows]
+        store.authors = array('I', (remap(self.authors[row]) for row in rows))
+        store.thumbnails = array('I', (remap(self.thumbnails[row]) for row in rows))
+        for row in rows:
+            store.tag_codes.extend(remap(code) for code in self.tag_codes[self.tag_offsets[row]:self.tag_offsets[row + 1]])
+            store.tag_offsets.append(len(store.tag_codes))
+        store.platforms = array('B', map(self.platforms.__getitem__, rows))
+        store.content_types = array('B', map(self.content_types.__getitem__, rows))
+        store.published = array('q', map(self.published.__getitem__, rows))
+        store.scraped = array('q', map(self.scraped.__getitem__, rows))
+        store.counts = {field: array('q', map(column.__getitem__, rows)) for field, column in self.counts.items()}
+        store.engagement_rates = array('d', map(self.engagement_rates.__getitem__, rows))
+        store.viral_scores = array('d', map(self.viral_scores.__getitem__, rows))
+        store.row_by_id = {content_id: row for row, content_id in enumerate(store.ids)}
+        return store
+
+    def sorted_by_score(self) -> "ColumnarContentStore":
+        return self.take(sorted(range(len(self.ids)), key=self.viral_scores.__getitem__, reverse=True))
+
+    def row(self, content_id: str) -> Optional[int]:
+        return self.row_by_id.get(content_id)
+
+    def platform_code(self, platform: Platform) -> int:
+        return PLATFORMS.index(Platform(platform))
+
+    def tags(self, row: int) -> List[str]:
+        return [self.strings[code] for code in self.tag_codes[self.tag_offsets[row]:self.tag_offsets[row + 1]]]
+
+    def scraped_date(self, row: int) -> Optional[datetime]:
+        return _decode_date(self.scraped[row])
+
+    def metrics(self, row: int) -> Dict[str, Any]:
+        metrics = {field: column[row] for field, column in self.counts.items()}
+        metrics["engagement_rate"] = self.engagement_rates[row]
+        return metrics
+
+    def set_engagement(self, row: int, metrics: EngagementMetrics, viral_score: Optional[float]):
+        for field, column in self.counts.items():
+            column[row] = getattr(metrics, field) or 0
+        self.engagement_rates[row] = metrics.engagement_rate or 0.0
+        self.viral_scores[row] = viral_score or 0.0
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Row as a content dict shaped like ViralContent.dict()"""
+        return {
+            "id": self.ids[row],
+            "title": self.titles[row],
+            "platform": PLATFORMS[self.platforms[row]],
+            "content_type": CONTENT_TYPES[self.content_types[row]],
+            "url": self.urls[row],
+            "content_text": self.content_texts[row],
+            "author": self.strings[self.authors[row]],
+            "published_date": _decode_date(self.published[row]),
+            "scraped_date": _decode_date(self.scraped[row]),
+            "engagement_metrics": self.metrics(row),
+            "viral_score": self.viral_scores[row],
+            "tags": self.tags(row),
+            "thumbnail_url": self.strings[self.thumbnails[row]]
+        }
+
+    def model(self, row: int) -> ViralContent:
+        # Columns are already typed, so validation here never parses strings
+        return ViralContent(**self.record(row))
+
+    def models(self, rows: Iterable[int]) -> List[ViralContent]:
+        return [self.model(row) for row in rows]
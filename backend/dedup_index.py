@@ -0,0 +1,156 @@
+import hashlib
+import re
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SIMHASH_BITS = 64
+
+
+def normalize_text(text: str) -> List[str]:
+    """Lowercase and tokenize text, dropping punctuation and very short tokens"""
+    return [token for token in _TOKEN_RE.findall((text or "").lower()) if len(token) > 1]
+
+
+def simhash(tokens: List[str]) -> int:
+    """64-bit SimHash over unigram and bigram features"""
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+
+    digests = b"".join(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest() for feature in features)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(len(features), 8), axis=1)
+    # A bit is set when more than half of the features have it set
+    majority = bits.sum(axis=0) * 2 > len(features)
+    return int.from_bytes(np.packbits(majority).tobytes(), "big")
+
+
+def text_fingerprint(title: str, content_text: Optional[str] = "") -> int:
+    """SimHash fingerprint of an item's title and body"""
+    return simhash(normalize_text(f"{title} {content_text or ''}"))
+
+
+class NearDuplicateIndex:
+    """Incremental SimHash index that groups near-duplicate content into clusters.
+
+    Fingerprints are split into ``max_distance + 1`` bands, so by the pigeonhole
+    principle any two fingerprints within ``max_distance`` bits share at least one
+    identical band. Lookups only compare against items in matching band buckets.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_width = _SIMHASH_BITS // self.bands
+        self.fingerprints: Dict[str, int] = {}
+        self.buckets: List[Dict[int, List[str]]] = [{} for _ in range(self.bands)]
+        self.parent: Dict[str, str] = {}
+        self.scores: Dict[str, float] = {}
+        self.canonical: Dict[str, str] = {}
+        self.members: Dict[str, Set[str]] = {}
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.band_width) - 1
+        return [fingerprint >> (band * self.band_width) & mask for band in range(self.bands)]
+
+    def _find(self, content_id: str) -> str:
+        root = content_id
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[content_id] != root:
+            self.parent[content_id], content_id = root, self.parent[content_id]
+        return root
+
+    def _union(self, a: str, b: str):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a == root_b:
+            return
+        if len(self.members[root_a]) < len(self.members[root_b]):
+            root_a, root_b = root_b, root_a
+
+        self.parent[root_b] = root_a
+        self.members[root_a] |= self.members.pop(root_b)
+        canonical_a, canonical_b = self.canonical[root_a], self.canonical.pop(root_b)
+        if self.scores[canonical_b] > self.scores[canonical_a]:
+            self.canonical[root_a] = canonical_b
+
+    def find_duplicates(self, title: str, content_text: Optional[str] = "", fingerprint: Optional[int] = None) -> List[str]:
+        """Return ids of indexed items within max_distance bits of the given text"""
+        if fingerprint is None:
+            fingerprint = text_fingerprint(title, content_text)
+        return self._candidates(fingerprint) if fingerprint else []
+
+    def _candidates(self, fingerprint: int) -> List[str]:
+        seen = set()
+        matches = []
+        for band, key in enumerate(self._band_keys(fingerprint)):
+            for candidate in self.buckets[band].get(key, []):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                if bin(fingerprint ^ self.fingerprints[candidate]).count("1") <= self.max_distance:
+                    matches.append(candidate)
+        return matches
+
+    def add(self, content_id: str, title: str, content_text: Optional[str] = "", score: float = 0.0,
+            fingerprint: Optional[int] = None) -> str:
+        """Index an item and return the canonical id of the cluster it joined.
+
+        A previously computed ``fingerprint`` skips tokenising and hashing.
+        """
+        if content_id in self.fingerprints:
+            return self.canonical_id(content_id)
+
+        if fingerprint is None:
+            fingerprint = text_fingerprint(title, content_text)
+        duplicates = self._candidates(fingerprint) if fingerprint else []
+
+        self.fingerprints[content_id] = fingerprint
+        self.parent[content_id] = content_id
+        self.scores[content_id] = score or 0.0
+        self.canonical[content_id] = content_id
+        self.members[content_id] = {content_id}
+
+        # Empty texts hash to zero, so keep them out of the buckets. Every band is
+        # indexed even when a duplicate already shares it: a later item may only be
+        # within max_distance of this one, and only through that band.
+        if fingerprint:
+            for band, key in enumerate(self._band_keys(fingerprint)):
+                self.buckets[band].setdefault(key, []).append(content_id)
+
+        for duplicate in duplicates:
+            self._union(content_id, duplicate)
+
+        return self.canonical_id(content_id)
+
+    def update_score(self, content_id: str, score: float) -> str:
+        """Record a new score for an indexed item and return its cluster's canonical id.
+
+        The canonical is re-picked from the whole cluster, since a drop in the
+        current canonical's score can hand the cluster to any other member.
+        """
+        if content_id not in self.parent:
+            return content_id
+        self.scores[content_id] = score or 0.0
+        root = self._find(content_id)
+        best = max(self.members[root], key=self.scores.__getitem__)
+        if self.scores[best] > self.scores[self.canonical[root]]:
+            self.canonical[root] = best
+        return self.canonical[root]
+
+    def canonical_id(self, content_id: str) -> str:
+        if content_id not in self.parent:
+            return content_id
+        return self.canonical[self._find(content_id)]
+
+    def is_canonical(self, content_id: str) -> bool:
+        return self.canonical_id(content_id) == content_id
+
+    def cluster_members(self, content_id: str) -> List[str]:
+        if content_id not in self.parent:
+            return [content_id]
+        return sorted(self.members[self._find(content_id)])
+
+    def cluster_count(self) -> int:
+        return len(self.members)
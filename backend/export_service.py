@@ -0,0 +1,161 @@
+import csv
+import io
+import json
+from typing import Any, Dict, Iterable, Iterator, List
+
+from archive_store import as_datetime
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+METRIC_FIELDS = ["views", "likes", "comments", "shares", "upvotes", "downvotes", "engagement_rate"]
+
+CSV_COLUMNS = [
+    "id", "title", "platform", "content_type", "url", "content_text", "author",
+    "published_date", "scraped_date", *METRIC_FIELDS, "viral_score", "tags", "thumbnail_url"
+]
+
+# Rows are buffered and flushed in batches so memory stays constant regardless of corpus size
+BATCH_SIZE = 1000
+
+
+def _iso(value: Any) -> Any:
+    parsed = as_datetime(value)
+    return parsed.isoformat() if parsed else None
+
+
+def _enum_value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+def export_record(content: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalise a stored content dict (dates as ISO strings, enums as values)"""
+    metrics = content.get("engagement_metrics") or {}
+    return {
+        "id": content["id"],
+        "title": content.get("title", ""),
+        "platform": _enum_value(content.get("platform")),
+        "content_type": _enum_value(content.get("content_type")),
+        "url": content.get("url", ""),
+        "content_text": content.get("content_text") or "",
+        "author": content.get("author") or "",
+        "published_date": _iso(content.get("published_date")),
+        "scraped_date": _iso(content.get("scraped_date")),
+        "engagement_metrics": {field: metrics.get(field) or 0 for field in METRIC_FIELDS},
+        "viral_score": content.get("viral_score") or 0.0,
+        "tags": list(content.get("tags") or []),
+        "thumbnail_url": content.get("thumbnail_url") or "",
+    }
+
+
+def flat_record(content: Dict[str, Any]) -> Dict[str, Any]:
+    record = export_record(content)
+    metrics = record.pop("engagement_metrics")
+    record.update(metrics)
+    return record
+
+
+def iter_ndjson(contents: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    lines: List[str] = []
+    for content in contents:
+        lines.append(json.dumps(export_record(content), ensure_ascii=False))
+        if len(lines) >= BATCH_SIZE:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def iter_csv(contents: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+
+    for count, content in enumerate(contents, start=1):
+        record = flat_record(content)
+        record["tags"] = "|".join(record["tags"])
+        writer.writerow(record)
+        if count % BATCH_SIZE == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to a generator"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_parquet(contents: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """Stream a Parquet file with one row group per batch (requires pyarrow)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.string()),
+        ("title", pa.string()),
+        ("platform", pa.string()),
+        ("content_type", pa.string()),
+        ("url", pa.string()),
+        ("content_text", pa.string()),
+        ("author", pa.string()),
+        ("published_date", pa.timestamp("us")),
+        ("scraped_date", pa.timestamp("us")),
+        ("views", pa.int64()),
+        ("likes", pa.int64()),
+        ("comments", pa.int64()),
+        ("shares", pa.int64()),
+        ("upvotes", pa.int64()),
+        ("downvotes", pa.int64()),
+        ("engagement_rate", pa.float64()),
+        ("viral_score", pa.float64()),
+        ("tags", pa.list_(pa.string())),
+        ("thumbnail_url", pa.string()),
+    ])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+
+    def write_batch(rows: List[Dict[str, Any]]):
+        for row in rows:
+            row["published_date"] = as_datetime(row["published_date"])
+            row["scraped_date"] = as_datetime(row["scraped_date"])
+        writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+
+    rows: List[Dict[str, Any]] = []
+    for content in contents:
+        rows.append(flat_record(content))
+        if len(rows) >= BATCH_SIZE:
+            write_batch(rows)
+            rows = []
+            yield sink.drain()
+
+    if rows:
+        write_batch(rows)
+    writer.close()
+    yield sink.drain()
@@ -1,24 +1,47 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from contextlib import asynccontextmanager
-import uvicorn
+import asyncio
+import importlib.util
 import os
+import time
 from dotenv import load_dotenv
 from typing import List, Optional
+from datetime import date
 
 from models import ViralContent, Platform, ContentType, EngagementMetrics, ScrapingRequest, ScrapingResponse, ContentAnalysis, ContentBrief
-from content_service import ContentService
 from ai_service import AIAnalysisService
 from scheduler import scheduler_instance
+from response_cache import ResponseCache, dumps
+from change_feed import sse_event
+from precompute import InsightPrecomputer
+from export_service import EXPORT_MEDIA_TYPES, iter_csv, iter_ndjson, iter_parquet
 
 load_dotenv()
 
+STARTED_AT = time.time()
+STREAM_POLL_SECONDS = 1.0
+# Paths that never read the content store, so they answer while it is still loading
+STORE_FREE_PATHS = {"/", "/health", "/health/ready", "/docs", "/redoc", "/openapi.json", "/content/stream",
+                    "/precompute/stats", "/scheduler/runs"}
+STREAM_KEEPALIVE_SECONDS = 15.0
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # "lazy" (default) serves immediately and warms the store in the background;
+    # "eager" loads the store before the first request is accepted
+    if os.getenv("STARTUP_MODE", "lazy") == "eager":
+        content_service.load()
+        warm_up = None
+    else:
+        warm_up = asyncio.create_task(asyncio.to_thread(content_service.load))
     scheduler_instance.start_scheduler()
     yield
     scheduler_instance.stop_scheduler()
+    precomputer.shutdown()
+    if warm_up:
+        await warm_up
 
 app = FastAPI(
     title="Viral Content Analyzer API",
@@ -27,16 +50,47 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+class StoreReadyMiddleware:
+    """Waits for the content store off the event loop before a request touches it.
+
+    The lazy load blocks on a lock held by the warm-up thread; running it on the
+    loop would freeze every other request, including /health.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and not content_service.ready and scope["path"] not in STORE_FREE_PATHS:
+            await asyncio.to_thread(content_service.load)
+        await self.app(scope, receive, send)
+
+app.add_middleware(StoreReadyMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://127.0.0.1:3000", 'https://decodo-viral-content-analyzer.vercel.app'],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the dashboard resume the change stream from the list it just loaded
+    expose_headers=["X-Content-Cursor"],
 )
 
-content_service = ContentService()
+# Share the scheduler's store so scheduled ingest and compaction are visible to the API
+content_service = scheduler_instance.content_service
 ai_service = AIAnalysisService()
+response_cache = ResponseCache()
+
+# Warm analyses and briefs for the top new items after every ingest (PRECOMPUTE_TOP_N=0 disables)
+precomputer = InsightPrecomputer(
+    ai_service,
+    top_n=int(os.getenv("PRECOMPUTE_TOP_N", "10")),
+    daily_budget=float(os.getenv("PRECOMPUTE_DAILY_BUDGET", "1.0")),
+    cost_per_call=float(os.getenv("PRECOMPUTE_COST_PER_CALL", "0.002"))
+)
+content_service.post_ingest_hooks.append(precomputer.on_ingest)
+content_service.update_hooks.append(precomputer.invalidate)
 
 @app.get("/")
 async def root():
@@ -44,7 +98,13 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "message": "API is running"}
+    return {"status": "healthy", "message": "API is running", "ready": content_service.ready, "uptime_seconds": time.time() - STARTED_AT}
+
+@app.get("/health/ready")
+async def readiness_check():
+    if not content_service.ready:
+        return JSONResponse(status_code=503, content={"status": "starting", "message": "Content store is loading"})
+    return {"status": "ready", "load_seconds": content_service.load_seconds, "content_count": len(content_service.store)}
 
 @app.post("/scrape", response_model=ScrapingResponse)
 async def scrape_content(request: ScrapingRequest):
@@ -54,7 +114,7 @@ async def scrape_content(request: ScrapingRequest):
             if platform not in [Platform.REDDIT, Platform.YOUTUBE, Platform.GOOGLE, Platform.BING]:
                 raise HTTPException(status_code=400, detail=f"Invalid platform: {platform}")
 
-        contents = content_service.scrape_trending_content(request)
+        contents = await asyncio.to_thread(content_service.scrape_trending_content, request)
         return ScrapingResponse(
             success=True,
             content_count=len(contents),
@@ -66,70 +126,202 @@ async def scrape_content(request: ScrapingRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
 
-@app.get("/content", response_model=List[ViralContent])
-async def get_all_content(platform: Optional[str] = None, min_viral_score: Optional[float] = None):
-    contents = content_service.get_all_content()
-
+def _filter_content(platform: Optional[str], min_viral_score: Optional[float], dedupe: bool) -> List[ViralContent]:
     # Filter by platform if specified
+    platform_enum = None
     if platform and platform != "all":
         try:
             platform_enum = Platform(platform.lower())
-            contents = [c for c in contents if c.platform == platform_enum]
         except ValueError:
             # Invalid platform, ignore filter
             pass
 
-    # Filter by minimum viral score if specified
-    if min_viral_score is not None and min_viral_score > 0:
-        contents = [c for c in contents if c.viral_score >= min_viral_score]
+    # Filters run on the store columns, so models are only built for matches
+    return content_service.filter_content(platform_enum, min_viral_score, dedupe)
+
+def _cursor_header(version: int):
+    return {"X-Content-Cursor": content_service.change_feed.cursor(version)}
 
-    return contents
+@app.get("/content", response_model=List[ViralContent])
+async def get_all_content(request: Request, platform: Optional[str] = None, min_viral_score: Optional[float] = None, dedupe: bool = False):
+    version = content_service.version
+    return response_cache.response(
+        request,
+        ("content", platform, min_viral_score, dedupe),
+        version,
+        lambda: _filter_content(platform, min_viral_score, dedupe),
+        headers=_cursor_header(version)
+    )
 
 @app.get("/content/platform/{platform}", response_model=List[ViralContent])
-async def get_content_by_platform(platform: Platform):
-    return content_service.get_content_by_platform(platform)
+async def get_content_by_platform(request: Request, platform: Platform, dedupe: bool = False):
+    version = content_service.version
+    return response_cache.response(
+        request,
+        ("content_platform", platform.value, dedupe),
+        version,
+        lambda: content_service.get_content_by_platform(platform, dedupe),
+        headers=_cursor_header(version)
+    )
+
+async def _change_stream(request: Request, version: Optional[int]):
+    feed = content_service.change_feed
+    if version is None:
+        # Unknown or stale cursor: the client reloads the list, then follows from here
+        version = feed.version
+        yield sse_event("reset", dumps({"cursor": feed.cursor(version)}), feed.cursor(version))
+
+    idle = 0.0
+    while not await request.is_disconnected():
+        deltas = feed.since(version)
+        if deltas is None:
+            version = feed.version
+            yield sse_event("reset", dumps({"cursor": feed.cursor(version)}), feed.cursor(version))
+            idle = 0.0
+            continue
+
+        for delta in deltas:
+            version = delta["version"]
+            if delta["added"] or delta["updated"] or delta["removed"]:
+                yield sse_event("delta", dumps({**delta, "cursor": feed.cursor(version)}), feed.cursor(version))
+                idle = 0.0
+
+        if idle >= STREAM_KEEPALIVE_SECONDS:
+            yield b": keepalive\n\n"
+            idle = 0.0
+        await asyncio.sleep(STREAM_POLL_SECONDS)
+        idle += STREAM_POLL_SECONDS
+
+@app.get("/content/stream")
+async def stream_content_changes(request: Request, since: Optional[str] = None):
+    # EventSource resends the last delivered id on reconnect, which takes precedence over ?since
+    cursor = request.headers.get("last-event-id") or since
+    return StreamingResponse(
+        _change_stream(request, content_service.change_feed.parse_cursor(cursor)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/content/search", response_model=List[ViralContent])
-async def search_content(q: str):
+async def search_content(q: str, dedupe: bool = False):
     if not q.strip():
         raise HTTPException(status_code=400, detail="Search query cannot be empty")
-    return content_service.search_content(q)
+    return content_service.search_content(q, dedupe)
 
 @app.get("/content/top", response_model=List[ViralContent])
-async def get_top_viral_content(limit: int = 10):
+async def get_top_viral_content(request: Request, limit: int = 10, dedupe: bool = False):
     if limit <= 0 or limit > 100:
         raise HTTPException(status_code=400, detail="Limit must be between 1 and 100")
-    return content_service.get_top_viral_content(limit)
+    return response_cache.response(
+        request,
+        ("content_top", limit, dedupe),
+        content_service.version,
+        lambda: content_service.get_top_viral_content(limit, dedupe)
+    )
+
+@app.get("/content/archive", response_model=List[ViralContent])
+async def search_archive(q: Optional[str] = None, start_date: Optional[date] = None, end_date: Optional[date] = None, limit: int = 100):
+    if limit <= 0 or limit > 1000:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 1000")
+    return content_service.search_archive(q, start_date, end_date, limit)
 
+@app.get("/content/archive/{content_id}", response_model=ViralContent)
+async def get_archived_content(content_id: str):
+    content = content_service.get_archived_content(content_id)
+    if not content:
+        raise HTTPException(status_code=404, detail="Archived content not found")
+    return content
+
+@app.get("/stats")
+async def get_stats():
+    return {
+        **content_service.get_stats(),
+        "total_analyses": ai_service.analysis_count,
+        "total_briefs": ai_service.brief_count
+    }
+
+@app.get("/precompute/stats")
+async def get_precompute_stats():
+    return precomputer.get_stats()
+
+@app.get("/export")
+async def export_content(format: str = "ndjson", platform: Optional[str] = None, min_viral_score: Optional[float] = None,
+                         dedupe: bool = False, start_date: Optional[date] = None, end_date: Optional[date] = None,
+                         include_archive: bool = False):
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Format must be one of: {', '.join(EXPORT_MEDIA_TYPES)}")
+
+    platform_enum = None
+    if platform and platform != "all":
+        try:
+            platform_enum = Platform(platform.lower())
+        except ValueError:
+            # Invalid platform, ignore filter
+            pass
+
+    encoders = {"ndjson": iter_ndjson, "csv": iter_csv, "parquet": iter_parquet}
+    if format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow to be installed")
+
+    contents = content_service.iter_contents(platform_enum, min_viral_score, dedupe, start_date, end_date, include_archive)
+    return StreamingResponse(
+        encoders[format](contents),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="viral_content.{format}"'}
+    )
+
+@app.get("/scheduler/runs")
+async def get_scheduler_runs(limit: int = 50):
+    if limit <= 0 or limit > 500:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 500")
+    return scheduler_instance.get_status(limit)
+
+@app.post("/compact")
+async def compact_content():
+    archived = await asyncio.to_thread(content_service.compact)
+    return {"archived": archived, "hot_count": len(content_service.store), "archive_count": len(content_service.archive)}
+
+@app.get("/content/{content_id}/duplicates", response_model=List[ViralContent])
+async def get_content_duplicates(content_id: str):
+    if content_service.get_content_by_id(content_id) is None:
+        raise HTTPException(status_code=404, detail="Content not found")
+    members = [content_service.get_content_by_id(member_id) for member_id in content_service.get_duplicate_cluster(content_id)]
+    return [member for member in members if member is not None]
+
+@app.get("/content/{content_id}/similar", response_model=List[ViralContent])
+async def get_similar_content(content_id: str, k: int = 10):
+    if k <= 0 or k > 100:
+        raise HTTPException(status_code=400, detail="k must be between 1 and 100")
+    if content_service.get_content_by_id(content_id) is None:
+        raise HTTPException(status_code=404, detail="Content not found")
+    return content_service.find_similar_content(content_id, k)
 
 @app.post("/analyze/{content_id}", response_model=ContentAnalysis)
 async def analyze_content(content_id: str):
-    contents = content_service.get_all_content()
-    content = next((c for c in contents if c.id == content_id), None)
+    content = content_service.get_content_by_id(content_id)
 
     if not content:
         raise HTTPException(status_code=404, detail="Content not found")
 
     try:
-        analysis = ai_service.analyze_viral_content(content)
+        analysis = precomputer.get_analysis(content)
         return analysis
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 @app.post("/generate-brief/{content_id}", response_model=ContentBrief)
 async def generate_content_brief(content_id: str):
-    contents = content_service.get_all_content()
-    content = next((c for c in contents if c.id == content_id), None)
+    content = content_service.get_content_by_id(content_id)
 
     if not content:
         raise HTTPException(status_code=404, detail="Content not found")
 
     try:
-        analysis = ai_service.analyze_viral_content(content)
-        brief = ai_service.generate_content_brief(content, analysis)
+        brief = precomputer.get_brief(content)
         return brief
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Brief generation failed: {str(e)}")
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
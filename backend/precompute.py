@@ -0,0 +1,174 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import ContentAnalysis, ContentBrief, ViralContent
+
+
+class InsightPrecomputer:
+    """Post-ingest stage that warms analyses and briefs for the top new items.
+
+    Warming runs on a single background thread so scraping never waits on it.
+    Each OpenAI call is charged ``cost_per_call`` against a daily budget; the
+    rule-based fallback is free. Cache misses on the request path are always
+    served but their calls are charged too, so they count against what the
+    warmer may spend that day. Results are kept in a bounded LRU that the
+    /analyze and /generate-brief endpoints read before computing anything.
+    """
+
+    def __init__(self, ai_service, top_n: int = 10, daily_budget: float = 1.0,
+                 cost_per_call: float = 0.002, max_entries: int = 5000):
+        self.ai_service = ai_service
+        self.top_n = top_n
+        self.daily_budget = daily_budget
+        self.cost_per_call = cost_per_call
+        self.max_entries = max_entries
+
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="insight-warmer")
+        self.analyses: "OrderedDict[str, Tuple[ContentAnalysis, str]]" = OrderedDict()
+        self.briefs: "OrderedDict[str, Tuple[ContentBrief, str]]" = OrderedDict()
+
+        self.budget_day = date.today()
+        self.spent_today = 0.0
+        self.spent_total = 0.0
+        self.warmed = 0
+        self.skipped_for_budget = 0
+        self.request_calls = 0
+        self.requests = 0
+        self.warm_hits = 0
+        self.cache_hits = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.top_n > 0
+
+    def _calls_cost(self, calls: int) -> float:
+        return calls * self.cost_per_call if self.ai_service._use_openai() else 0.0
+
+    def _charge(self, calls: int, force: bool = False) -> bool:
+        """Reserve budget for calls, returning False when the daily budget is exhausted.
+
+        Forced charges (interactive requests) are always recorded, even over budget.
+        """
+        cost = self._calls_cost(calls)
+        with self.lock:
+            if self.budget_day != date.today():
+                self.budget_day = date.today()
+                self.spent_today = 0.0
+            if not force and self.spent_today + cost > self.daily_budget:
+                return False
+            self.spent_today += cost
+            self.spent_total += cost
+            return True
+
+    def _store(self, cache: "OrderedDict[str, Tuple[Any, str]]", content_id: str, value: Any, source: str):
+        with self.lock:
+            cache[content_id] = (value, source)
+            cache.move_to_end(content_id)
+            while len(cache) > self.max_entries:
+                cache.popitem(last=False)
+
+    def on_ingest(self, new_contents: List[ViralContent]):
+        """Hook for ContentService.post_ingest_hooks"""
+        if not self.enabled or not new_contents:
+            return
+        top = sorted(new_contents, key=lambda content: content.viral_score or 0.0, reverse=True)[:self.top_n]
+        self.executor.submit(self._warm, top)
+
+    def invalidate(self, content_ids: List[str]):
+        """Hook for ContentService.update_hooks: drop insights computed from stale metrics"""
+        with self.lock:
+            for content_id in content_ids:
+                self.analyses.pop(content_id, None)
+                self.briefs.pop(content_id, None)
+
+    def _warm(self, contents: List[ViralContent]):
+        try:
+            # One analysis and one brief per item
+            affordable = []
+            for index, content in enumerate(contents):
+                with self.lock:
+                    cached = content.id in self.briefs
+                if cached:
+                    continue
+                if not self._charge(2):
+                    with self.lock:
+                        self.skipped_for_budget += len(contents) - index
+                    break
+                affordable.append(content)
+            if not affordable:
+                return
+
+            analyses = self.ai_service.analyze_batch(affordable)
+            briefs = self.ai_service.generate_brief_batch(affordable, analyses)
+            for content, analysis, brief in zip(affordable, analyses, briefs):
+                self._store(self.analyses, content.id, analysis, "warm")
+                self._store(self.briefs, content.id, brief, "warm")
+            with self.lock:
+                self.warmed += len(affordable)
+            print(f"Precomputed analyses and briefs for {len(affordable)} contents")
+
+        except Exception as e:
+            print(f"Error precomputing insights: {e}")
+
+    def _lookup(self, cache: "OrderedDict[str, Tuple[Any, str]]", content_id: str, record: bool = True) -> Optional[Any]:
+        with self.lock:
+            if record:
+                self.requests += 1
+            entry = cache.get(content_id)
+            if entry is None:
+                return None
+            cache.move_to_end(content_id)
+            if record and entry[1] == "warm":
+                self.warm_hits += 1
+            elif record:
+                self.cache_hits += 1
+            return entry[0]
+
+    def _charge_request(self):
+        self._charge(1, force=True)
+        with self.lock:
+            self.request_calls += 1
+
+    def get_analysis(self, content: ViralContent, record: bool = True) -> ContentAnalysis:
+        analysis = self._lookup(self.analyses, content.id, record)
+        if analysis is None:
+            self._charge_request()
+            analysis = self.ai_service.analyze_viral_content(content)
+            self._store(self.analyses, content.id, analysis, "request")
+        return analysis
+
+    def get_brief(self, content: ViralContent) -> ContentBrief:
+        brief = self._lookup(self.briefs, content.id)
+        if brief is None:
+            analysis = self.get_analysis(content, record=False)
+            self._charge_request()
+            brief = self.ai_service.generate_content_brief(content, analysis)
+            self._store(self.briefs, content.id, brief, "request")
+        return brief
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "enabled": self.enabled,
+                "top_n": self.top_n,
+                "daily_budget": self.daily_budget,
+                "cost_per_call": self.cost_per_call,
+                "spent_today": self.spent_today,
+                "spent_total": self.spent_total,
+                "warmed": self.warmed,
+                "skipped_for_budget": self.skipped_for_budget,
+                "request_calls": self.request_calls,
+                "requests": self.requests,
+                "warm_hits": self.warm_hits,
+                "cache_hits": self.cache_hits,
+                "warm_hit_rate": self.warm_hits / self.requests if self.requests else None,
+                "cached_analyses": len(self.analyses),
+                "cached_briefs": len(self.briefs)
+            }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
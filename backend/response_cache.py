@@ -0,0 +1,129 @@
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from datetime import date, datetime
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_COMPRESS_BYTES = 1024
+
+
+def _orjson_default(value: Any) -> Any:
+    # orjson handles datetimes and enums natively, so models only need dumping to Python values
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(payload: Any) -> bytes:
+    """Encode a response payload to JSON bytes, using orjson when it is installed.
+
+    Models are serialised directly instead of being walked by jsonable_encoder,
+    which is the expensive part of encoding a large list.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=_orjson_default)
+    return json.dumps(payload, default=_json_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class CachedBody:
+    def __init__(self, version: int, body: bytes):
+        self.version = version
+        self.body = body
+        self.etag = f'"v{version}-{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+        self.encoded: Dict[str, bytes] = {}
+
+    def encode(self, encoding: str) -> bytes:
+        if encoding not in self.encoded:
+            if encoding == "br":
+                self.encoded[encoding] = brotli.compress(self.body, quality=5)
+            else:
+                self.encoded[encoding] = gzip.compress(self.body, compresslevel=6)
+        return self.encoded[encoding]
+
+
+class ResponseCache:
+    """Serialised JSON bodies keyed by (endpoint, query) and the store version.
+
+    An entry is reused until the content store version changes, so repeated
+    dashboard polls skip model validation and encoding entirely. Clients that
+    send a matching ``If-None-Match`` get an empty 304.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[Hashable, ...], CachedBody]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[Hashable, ...], version: int, build: Callable[[], Any]) -> CachedBody:
+        entry = self.entries.get(key)
+        if entry is not None and entry.version == version:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = CachedBody(version, dumps(build()))
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self.entries.clear()
+
+    def response(self, request: Request, key: Tuple[Hashable, ...], version: int, build: Callable[[], Any],
+                 headers: Optional[Dict[str, str]] = None) -> Response:
+        entry = self.get(key, version, build)
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding", **(headers or {})}
+
+        if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+
+        body = entry.body
+        encoding = _pick_encoding(request.headers.get("accept-encoding", "")) if len(body) >= MIN_COMPRESS_BYTES else None
+        if encoding:
+            body = entry.encode(encoding)
+            headers["Content-Encoding"] = encoding
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any((candidate[2:] if candidate.startswith("W/") else candidate) == etag for candidate in candidates)
+
+
+def _pick_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
@@ -2,40 +2,161 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from content_service import ContentService
 from models import ScrapingRequest, Platform
+from scheduler_store import SchedulerRunStore
+from typing import Any, Dict, Optional
 import asyncio
 import logging
+import os
+import socket
+import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_KEYWORDS = ['viral', 'trending', 'popular', 'hot']
+
+# One job per source, each with its own adaptive interval
+SCRAPE_SOURCES = [
+    {"id": "reddit", "platforms": [Platform.REDDIT], "keywords": DEFAULT_KEYWORDS, "limit": 50},
+    {"id": "google", "platforms": [Platform.GOOGLE], "keywords": DEFAULT_KEYWORDS, "limit": 50},
+    {"id": "bing", "platforms": [Platform.BING], "keywords": DEFAULT_KEYWORDS, "limit": 50},
+]
+
+INITIAL_INTERVAL_MINUTES = 120
+MIN_INTERVAL_MINUTES = 30
+MAX_INTERVAL_MINUTES = 720
+HIGH_YIELD_ITEMS = 10
+INTERVAL_STEP = 1.5
+JITTER_FRACTION = 0.1
+LOCK_TTL_SECONDS = 30 * 60
+# How often each worker checks for a store saved by another worker
+STORE_SYNC_SECONDS = int(os.getenv("STORE_SYNC_SECONDS", "30"))
+
 class ContentScrapingScheduler:
     def __init__(self):
         self.scheduler = AsyncIOScheduler()
         self.content_service = ContentService()
+        self.run_store = SchedulerRunStore("scheduler_state.db")
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.intervals: Dict[str, float] = {source["id"]: INITIAL_INTERVAL_MINUTES for source in SCRAPE_SOURCES}
+
+    def _trigger(self, interval_minutes: float) -> IntervalTrigger:
+        return IntervalTrigger(minutes=interval_minutes, jitter=int(interval_minutes * 60 * JITTER_FRACTION))
 
-    async def scrape_viral_content_job(self):
-        logger.info("Starting scheduled viral content scraping...")
+    def _adapt_interval(self, source_id: str) -> float:
+        """Back off sources that keep yielding nothing new and speed up productive ones"""
+        yields = self.run_store.recent_yields(source_id, limit=3)
+        interval = self.intervals[source_id]
+        if yields:
+            average_yield = sum(yields) / len(yields)
+            if average_yield == 0:
+                interval = min(interval * INTERVAL_STEP, MAX_INTERVAL_MINUTES)
+            elif average_yield >= HIGH_YIELD_ITEMS:
+                interval = max(interval / INTERVAL_STEP, MIN_INTERVAL_MINUTES)
 
+        if interval != self.intervals[source_id]:
+            self.intervals[source_id] = interval
+            job = self.scheduler.get_job(f"scrape_{source_id}")
+            if job:
+                job.reschedule(trigger=self._trigger(interval))
+            logger.info(f"Rescheduled {source_id} scraping every {interval:.0f} minutes")
+        return interval
+
+    async def _run_guarded(self, source_id: str, min_gap_seconds: float, job) -> Optional[int]:
+        # Skip if another worker holds the lease or already ran this source recently
+        if not self.run_store.try_acquire(source_id, self.owner, LOCK_TTL_SECONDS, min_gap_seconds):
+            logger.info(f"Skipping {source_id}: already running or recently run by another worker")
+            return None
+
+        started_at = time.time()
+        new_items, status, error = 0, "success", None
         try:
+            # Jobs touch the whole store, so they run on a worker thread to keep the API responsive
+            new_items = await asyncio.to_thread(job)
+        except Exception as e:
+            status, error = "error", str(e)
+            raise
+        finally:
+            self.run_store.record_run(
+                source_id, self.owner, started_at, time.time() - started_at, new_items, status,
+                self.intervals.get(source_id), error
+            )
+            self.run_store.release(source_id, self.owner)
+        return new_items
+
+    async def scrape_source_job(self, source: Dict[str, Any]):
+        source_id = source["id"]
+        logger.info(f"Starting scheduled scraping for {source_id}...")
+
+        def scrape() -> int:
             scraping_request = ScrapingRequest(
-                platforms=[Platform.REDDIT, Platform.GOOGLE, Platform.BING],
-                keywords=['viral', 'trending', 'popular', 'hot'],
-                limit=50,
+                platforms=source["platforms"],
+                keywords=source["keywords"],
+                limit=source["limit"],
                 time_range="24h"
             )
+            _, new_contents = self.content_service.scrape_and_ingest(scraping_request)
+            return len(new_contents)
 
-            contents = self.content_service.scrape_trending_content(scraping_request)
-            logger.info(f"Successfully scraped {len(contents)} viral contents")
+        try:
+            new_items = await self._run_guarded(source_id, self.intervals[source_id] * 60 / 2, scrape)
+            if new_items is not None:
+                logger.info(f"Scraped {new_items} new contents from {source_id}")
+                self._adapt_interval(source_id)
 
         except Exception as e:
-            logger.error(f"Error during scheduled scraping: {e}")
+            logger.error(f"Error during scheduled scraping for {source_id}: {e}")
+
+    async def compact_content_job(self):
+        logger.info("Starting scheduled content compaction...")
+
+        try:
+            archived = await self._run_guarded("compaction", 0, self.content_service.compact)
+            if archived is not None:
+                logger.info(f"Archived {archived} expired contents")
+
+        except Exception as e:
+            logger.error(f"Error during content compaction: {e}")
+
+    async def sync_store_job(self):
+        # Runs in every worker: only the lease holder scrapes, the others reload what it saved
+        try:
+            if await asyncio.to_thread(self.content_service.sync_from_disk):
+                logger.info("Reloaded content saved by another worker")
+
+        except Exception as e:
+            logger.error(f"Error syncing content store: {e}")
 
     def start_scheduler(self):
+        for source in SCRAPE_SOURCES:
+            self.scheduler.add_job(
+                self.scrape_source_job,
+                trigger=self._trigger(self.intervals[source["id"]]),
+                args=[source],
+                id=f"scrape_{source['id']}",
+                name=f"Scrape {source['id']} content (adaptive interval)",
+                max_instances=1,
+                coalesce=True,
+                replace_existing=True
+            )
+
+        self.scheduler.add_job(
+            self.compact_content_job,
+            trigger=IntervalTrigger(hours=6),
+            id='content_compaction',
+            name='Archive expired content every 6 hours',
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True
+        )
+
         self.scheduler.add_job(
-            self.scrape_viral_content_job,
-            trigger=IntervalTrigger(hours=2),
-            id='viral_content_scraping',
-            name='Scrape viral content every 2 hours',
+            self.sync_store_job,
+            trigger=IntervalTrigger(seconds=STORE_SYNC_SECONDS),
+            id='store_sync',
+            name='Reload content saved by other workers',
+            max_instances=1,
+            coalesce=True,
             replace_existing=True
         )
 
@@ -48,4 +169,14 @@ class ContentScrapingScheduler:
         self.scheduler.shutdown()
         logger.info("Content scraping scheduler stopped")
 
-scheduler_instance = ContentScrapingScheduler()
\ No newline at end of file
+    def get_status(self, limit: int = 50) -> Dict[str, Any]:
+        sources = {}
+        for source in SCRAPE_SOURCES:
+            job = self.scheduler.get_job(f"scrape_{source['id']}") if self.scheduler.running else None
+            sources[source["id"]] = {
+                "interval_minutes": self.intervals[source["id"]],
+                "next_run_time": job.next_run_time.isoformat() if job and job.next_run_time else None
+            }
+        return {"owner": self.owner, "sources": sources, "runs": self.run_store.recent_runs(limit)}
+
+scheduler_instance = ContentScrapingScheduler()
@@ -0,0 +1,103 @@
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+
+
+class SchedulerRunStore:
+    """SQLite-backed run history and cross-process locks for scheduled jobs.
+
+    Every API worker starts its own scheduler, so a job first claims a lease
+    row for its source inside an IMMEDIATE transaction. Workers that lose the
+    race, or fire shortly after another worker already ran the source, skip.
+    """
+
+    def __init__(self, path: str = "scheduler_state.db"):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_locks (
+                    source TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    source TEXT NOT NULL,
+                    owner TEXT NOT NULL,
+                    started_at REAL NOT NULL,
+                    duration_seconds REAL NOT NULL,
+                    new_items INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    interval_minutes REAL,
+                    error TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_job_runs_source ON job_runs (source, started_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def try_acquire(self, source: str, owner: str, ttl_seconds: float, min_gap_seconds: float = 0) -> bool:
+        """Claim the lease for a source unless it is held or the source ran too recently"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            lock = conn.execute("SELECT owner, expires_at FROM job_locks WHERE source = ?", (source,)).fetchone()
+            if lock and lock["expires_at"] > now and lock["owner"] != owner:
+                conn.execute("ROLLBACK")
+                return False
+
+            last_run = conn.execute(
+                "SELECT MAX(started_at) AS started_at FROM job_runs WHERE source = ? AND status = 'success'",
+                (source,)
+            ).fetchone()
+            if min_gap_seconds and last_run["started_at"] and now - last_run["started_at"] < min_gap_seconds:
+                conn.execute("ROLLBACK")
+                return False
+
+            conn.execute(
+                "INSERT OR REPLACE INTO job_locks (source, owner, expires_at) VALUES (?, ?, ?)",
+                (source, owner, now + ttl_seconds)
+            )
+            conn.execute("COMMIT")
+            return True
+        finally:
+            conn.close()
+
+    def release(self, source: str, owner: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM job_locks WHERE source = ? AND owner = ?", (source, owner))
+
+    def record_run(self, source: str, owner: str, started_at: float, duration_seconds: float, new_items: int,
+                   status: str, interval_minutes: Optional[float] = None, error: Optional[str] = None):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO job_runs (source, owner, started_at, duration_seconds, new_items, status, interval_minutes, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (source, owner, started_at, duration_seconds, new_items, status, interval_minutes, error)
+            )
+
+    def recent_runs(self, limit: int = 50, source: Optional[str] = None) -> List[Dict[str, Any]]:
+        query = "SELECT * FROM job_runs"
+        params: List[Any] = []
+        if source:
+            query += " WHERE source = ?"
+            params.append(source)
+        query += " ORDER BY started_at DESC LIMIT ?"
+        params.append(limit)
+
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+
+    def recent_yields(self, source: str, limit: int = 5) -> List[int]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT new_items FROM job_runs WHERE source = ? AND status = 'success' ORDER BY started_at DESC LIMIT ?",
+                (source, limit)
+            ).fetchall()
+        return [row["new_items"] for row in rows]
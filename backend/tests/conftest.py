@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# Backend modules import each other by their flat names
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def content_service(tmp_path, monkeypatch):
+    """A ContentService whose store, snapshot, vectors and archive live in tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    from content_service import ContentService
+
+    service = ContentService()
+    service.load()
+    return service
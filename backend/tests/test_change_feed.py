@@ -0,0 +1,97 @@
+from change_feed import ChangeFeed, sse_event
+
+
+def publish_versions(feed: ChangeFeed, *versions: int):
+    for version in versions:
+        feed.publish(version, added=[{"id": f"item-{version}"}])
+
+
+def test_since_returns_deltas_after_cursor_in_order():
+    feed = ChangeFeed()
+    publish_versions(feed, 1, 2, 3)
+
+    deltas = feed.since(1)
+    assert [delta["version"] for delta in deltas] == [2, 3]
+    assert deltas[0] == {"version": 2, "added": [{"id": "item-2"}], "updated": [], "removed": []}
+
+
+def test_since_current_version_is_empty():
+    feed = ChangeFeed()
+    assert feed.since(0) == []
+    publish_versions(feed, 1)
+    assert feed.since(1) == []
+
+
+def test_since_future_version_needs_reset():
+    feed = ChangeFeed()
+    publish_versions(feed, 1)
+    assert feed.since(5) is None
+
+
+def test_since_evicted_version_needs_reset():
+    feed = ChangeFeed(max_versions=2)
+    publish_versions(feed, 1, 2, 3, 4)
+
+    assert feed.since(1) is None
+    assert [delta["version"] for delta in feed.since(2)] == [3, 4]
+
+
+def test_since_with_no_retained_deltas_needs_reset():
+    feed = ChangeFeed()
+    feed.version = 3
+    assert feed.since(1) is None
+
+
+def test_cursor_round_trip():
+    feed = ChangeFeed()
+    publish_versions(feed, 1, 2)
+
+    assert feed.cursor() == f"{feed.epoch}.2"
+    assert feed.parse_cursor(feed.cursor()) == 2
+    assert feed.parse_cursor(feed.cursor(1)) == 1
+
+
+def test_cursor_from_another_process_is_rejected():
+    feed = ChangeFeed()
+    other = ChangeFeed()
+    other.epoch = feed.epoch + "0"
+
+    assert feed.parse_cursor(other.cursor(1)) is None
+    assert feed.parse_cursor(f"{feed.epoch}.latest") is None
+    assert feed.parse_cursor("") is None
+    assert feed.parse_cursor(None) is None
+
+
+def test_sse_event_framing():
+    assert sse_event("delta", b'{"a":1}', "e.1") == b'id: e.1\nevent: delta\ndata: {"a":1}\n\n'
+    assert sse_event("reset", b"{}") == b"event: reset\ndata: {}\n\n"
+
+
+def test_rescraped_item_is_published_as_update_and_evicts_insights(content_service):
+    from datetime import datetime
+
+    from models import ContentType, EngagementMetrics, Platform, ViralContent
+
+    def make_content(views: int, score: float) -> ViralContent:
+        return ViralContent(
+            id="first-id", title="Rescraped story", platform=Platform.REDDIT, content_type=ContentType.POST,
+            url="https://example.com/story", scraped_date=datetime.now(),
+            engagement_metrics=EngagementMetrics(views=views), viral_score=score
+        )
+
+    evicted = []
+    content_service.update_hooks.append(evicted.extend)
+    with content_service._exclusive():
+        content_service._ingest([make_content(10, 5.0)])
+    version = content_service.version
+
+    rescraped = make_content(500, 40.0)
+    rescraped.id = "second-id"
+    with content_service._exclusive():
+        assert content_service._ingest([rescraped]) == []
+
+    delta = content_service.change_feed.since(version)[0]
+    assert delta["added"] == []
+    assert [(item["id"], item["viral_score"]) for item in delta["updated"]] == [("first-id", 40.0)]
+    assert evicted == ["first-id"]
+    assert content_service.dedup_index.scores["first-id"] == 40.0
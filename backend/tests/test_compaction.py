@@ -0,0 +1,148 @@
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+from archive_store import ContentArchive
+from models import ContentType, EngagementMetrics, Platform, ViralContent
+
+NOW = datetime(2024, 6, 30, 12, 0)
+
+
+def make_content(content_id: str, score: float, age_days: int, title: str = "") -> ViralContent:
+    return ViralContent(
+        id=content_id,
+        title=title or f"Unique story number {content_id} about topic {content_id}",
+        platform=Platform.REDDIT,
+        content_type=ContentType.POST,
+        url=f"https://example.com/{content_id}",
+        content_text=f"Body text for {content_id}",
+        scraped_date=NOW - timedelta(days=age_days),
+        engagement_metrics=EngagementMetrics(views=100, likes=10),
+        viral_score=score,
+        tags=["news"]
+    )
+
+
+def ingest(service, contents):
+    with service._exclusive():
+        return service._ingest(contents)
+
+
+def test_expired_low_score_items_move_to_archive(content_service):
+    ingest(content_service, [
+        make_content("fresh", 50, age_days=1),
+        make_content("old", 50, age_days=45),
+        make_content("old-viral", 95, age_days=45),
+    ])
+    version = content_service.version
+
+    assert content_service.compact(NOW) == 1
+    assert content_service.store.ids == ["old-viral", "fresh"]
+    assert content_service.get_content_by_id("old") is None
+    assert content_service.get_archived_content("old").id == "old"
+    assert len(content_service.archive) == 1
+
+    assert content_service.version == version + 1
+    assert content_service.change_feed.since(version)[0]["removed"] == ["old"]
+    assert "old" not in content_service.dedup_index.fingerprints
+    assert content_service.get_stats()["total_content"] == 2
+
+
+def test_nothing_expired_is_a_no_op(content_service):
+    ingest(content_service, [make_content("fresh", 50, age_days=1)])
+    version = content_service.version
+
+    assert content_service.compact(NOW) == 0
+    assert content_service.version == version
+    assert len(content_service.archive) == 0
+
+
+def test_max_items_archives_lowest_scores(content_service):
+    content_service.retention_max_items = 2
+    ingest(content_service, [make_content(f"item-{score}", score, age_days=1) for score in (10, 20, 30, 40)])
+
+    assert content_service.compact(NOW) == 2
+    assert content_service.store.ids == ["item-40", "item-30"]
+    assert {content.id for content in content_service.search_archive()} == {"item-10", "item-20"}
+
+
+def test_compaction_rebuilds_vectors_once_dead_rows_dominate(content_service):
+    ingest(content_service, [make_content(f"item-{index}", 50, age_days=45 if index else 1) for index in range(5)])
+    assert len(content_service.vector_index) == 5
+    vector_index = content_service.vector_index
+
+    content_service.compact(NOW)
+    assert content_service.vector_index is not vector_index
+    assert content_service.vector_index.ids == ["item-0"]
+    assert not any(name.startswith("vector_index.rebuild") for name in os.listdir("."))
+
+
+def test_similar_content_skips_archived_rows(content_service):
+    ingest(content_service, [
+        make_content("a", 50, age_days=1, title="Python data processing tips"),
+        make_content("b", 50, age_days=1, title="Python data processing tricks"),
+        make_content("c", 40, age_days=45, title="Python data processing guide"),
+    ])
+    # One archived row out of three stays below the rebuild threshold
+    content_service.compact(NOW)
+    assert "c" in content_service.vector_index
+
+    assert [content.id for content in content_service.find_similar_content("a", k=2)] == ["b"]
+
+
+def test_compacted_store_survives_a_restart(content_service):
+    from content_service import ContentService
+
+    ingest(content_service, [make_content("fresh", 50, age_days=1), make_content("old", 50, age_days=45)])
+    content_service.compact(NOW)
+
+    reloaded = ContentService()
+    reloaded.load()
+    assert reloaded.store.ids == ["fresh"]
+    assert reloaded.get_archived_content("old").id == "old"
+
+
+def test_archive_segments_by_scrape_day(tmp_path):
+    archive = ContentArchive(str(tmp_path / "archive"))
+    archive.append([
+        {"id": "a", "scraped_date": "2024-01-01T08:00:00"},
+        {"id": "b", "scraped_date": "2024-01-02T08:00:00"},
+    ])
+    archive.append([{"id": "c", "scraped_date": "2024-01-01T20:00:00"}])
+
+    assert archive.segment_days() == ["2024-01-01", "2024-01-02"]
+    assert (tmp_path / "archive" / "contents-2024-01-01.ids").read_text() == "a\nc\n"
+    assert len(archive) == 3
+    assert archive.get("c")["scraped_date"] == "2024-01-01T20:00:00"
+    assert archive.get("missing") is None
+    assert [content["id"] for content in archive.iter_contents(datetime(2024, 1, 2).date())] == ["b"]
+
+
+def test_archive_search_matches_title_text_and_tags(tmp_path):
+    archive = ContentArchive(str(tmp_path / "archive"))
+    archive.append([
+        {"id": "a", "title": "Python tips", "scraped_date": "2024-01-01T08:00:00"},
+        {"id": "b", "title": "Cooking", "content_text": "python recipes", "scraped_date": "2024-01-01T08:00:00"},
+        {"id": "c", "title": "Cars", "tags": ["Python"], "scraped_date": "2024-01-01T08:00:00"},
+        {"id": "d", "title": "Other", "scraped_date": "2024-01-01T08:00:00"},
+    ])
+
+    assert [content["id"] for content in archive.search("python")] == ["a", "b", "c"]
+    assert len(archive.search("python", limit=2)) == 2
+
+
+def test_segment_without_ids_file_is_scanned(tmp_path):
+    directory = tmp_path / "archive"
+    directory.mkdir()
+    with gzip.open(directory / "contents-2024-01-01.ndjson.gz", "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"id": "legacy", "scraped_date": "2024-01-01T08:00:00"}) + "\n")
+    (directory / "index.json").write_text('{"legacy": "2024-01-01"')
+
+    archive = ContentArchive(str(directory))
+    assert len(archive) == 1
+    assert archive.get("legacy")["id"] == "legacy"
+
+    archive.append([{"id": "new", "scraped_date": "2024-01-01T09:00:00"}])
+    assert (directory / "contents-2024-01-01.ids").read_text() == "legacy\nnew\n"
+    assert not (directory / "index.json").exists()
@@ -0,0 +1,105 @@
+import pickle
+from datetime import datetime
+
+from content_store import ColumnarContentStore
+from models import ContentType, EngagementMetrics, Platform, ViralContent
+
+
+def make_content(content_id: str, score: float, author: str = "alice", tags=("programming",),
+                 published: bool = True) -> ViralContent:
+    return ViralContent(
+        id=content_id,
+        title=f"Title {content_id}",
+        platform=Platform.REDDIT,
+        content_type=ContentType.POST,
+        url=f"https://example.com/{content_id}",
+        content_text=f"Body of {content_id}",
+        author=author,
+        published_date=datetime(2024, 5, 1, 12, 30, 15, 123456) if published else None,
+        scraped_date=datetime(2024, 5, 2, 8, 0),
+        engagement_metrics=EngagementMetrics(views=100, likes=7, comments=3, upvotes=7, engagement_rate=0.1),
+        viral_score=score,
+        tags=list(tags),
+        thumbnail_url=""
+    )
+
+
+def test_record_round_trips_model_dict():
+    content = make_content("a", 42.5)
+    store = ColumnarContentStore.from_records([content.dict()])
+
+    assert store.record(0) == content.dict()
+    assert store.model(0) == content
+    assert list(store) == [content.dict()]
+
+
+def test_missing_published_date_and_empty_tags():
+    content = make_content("a", 1.0, tags=(), published=False)
+    store = ColumnarContentStore.from_records([content.dict()])
+
+    assert store.model(0) == content
+    assert store.record(0)["published_date"] is None
+    assert store.tags(0) == []
+
+
+def test_records_read_back_from_json():
+    content = make_content("a", 3.0)
+    record = content.dict()
+    record.update(platform="reddit", content_type="post",
+                  published_date=content.published_date.isoformat(), scraped_date=content.scraped_date.isoformat())
+
+    store = ColumnarContentStore.from_records([record])
+    assert store.model(0) == content
+
+
+def test_repeated_strings_are_interned_once():
+    store = ColumnarContentStore.from_records(
+        make_content(str(i), i, author="alice", tags=("programming", "python")).dict() for i in range(50)
+    )
+    # "", "alice", "programming" and "python"
+    assert len(store.strings) == 4
+
+
+def test_sorted_by_score_and_row_lookup():
+    store = ColumnarContentStore.from_records(make_content(cid, score).dict() for cid, score in [("a", 1), ("b", 3), ("c", 2)])
+
+    ordered = store.sorted_by_score()
+    assert ordered.ids == ["b", "c", "a"]
+    assert ordered.row("a") == 2
+    assert ordered.row("missing") is None
+    assert "a" in ordered and "missing" not in ordered
+    assert ordered.model(ordered.row("c")) == store.model(store.row("c"))
+
+
+def test_take_with_reintern_drops_unused_strings():
+    store = ColumnarContentStore.from_records([
+        make_content("a", 1, author="alice", tags=("old",)).dict(),
+        make_content("b", 2, author="bob", tags=("new",)).dict()
+    ])
+
+    compacted = store.take([1], reintern=True)
+    assert compacted.strings is not store.strings
+    assert "alice" not in compacted.strings.codes and "old" not in compacted.strings.codes
+    assert compacted.model(0) == store.model(1)
+    assert store.take([1]).strings is store.strings
+
+
+def test_set_engagement_updates_metrics_and_score():
+    store = ColumnarContentStore.from_records([make_content("a", 1).dict()])
+    metrics = EngagementMetrics(views=500, likes=None, comments=9, engagement_rate=None)
+
+    store.set_engagement(0, metrics, 88.0)
+    model = store.model(0)
+    assert model.viral_score == 88.0
+    assert model.engagement_metrics.views == 500
+    assert model.engagement_metrics.likes == 0
+    assert model.engagement_metrics.engagement_rate == 0.0
+
+
+def test_pickle_round_trip_rebuilds_lookups():
+    contents = [make_content(cid, score).dict() for cid, score in [("a", 1), ("b", 2)]]
+    store = pickle.loads(pickle.dumps(ColumnarContentStore.from_records(contents)))
+
+    assert store.row("b") == 1
+    assert store.strings.intern("alice") == store.authors[0]
+    assert list(store) == contents
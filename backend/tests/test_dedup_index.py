@@ -0,0 +1,115 @@
+import pickle
+
+from dedup_index import NearDuplicateIndex, text_fingerprint
+
+STORY = "Apple announces the new iPhone with a faster chip and better battery life"
+
+
+def flip_bits(fingerprint: int, *bits: int) -> int:
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+def test_reposts_cluster_under_highest_score():
+    index = NearDuplicateIndex()
+    assert index.add("a", STORY, score=10) == "a"
+    assert index.add("b", STORY + "!", score=50) == "b"
+    assert index.add("c", "Local bakery wins award for sourdough bread", score=99) == "c"
+
+    assert index.canonical_id("a") == "b"
+    assert index.cluster_members("a") == ["a", "b"]
+    assert not index.is_canonical("a")
+    assert index.cluster_members("c") == ["c"]
+    assert index.cluster_count() == 2
+
+
+def test_fingerprints_within_max_distance_share_a_band():
+    index = NearDuplicateIndex(max_distance=3)
+    base = text_fingerprint(STORY)
+    index.add("base", "", score=5, fingerprint=base)
+
+    # One flipped bit in each of three bands still leaves one band identical
+    near = flip_bits(base, 0, 16, 32)
+    assert index.find_duplicates("", fingerprint=near) == ["base"]
+    assert index.add("near", "", fingerprint=near) == "base"
+
+
+def test_fingerprints_beyond_max_distance_do_not_match():
+    index = NearDuplicateIndex(max_distance=3)
+    base = text_fingerprint(STORY)
+    index.add("base", "", fingerprint=base)
+
+    # Shares band 3 but is four bits away
+    assert index.find_duplicates("", fingerprint=flip_bits(base, 0, 1, 16, 32)) == []
+    # Differs in every band
+    assert index.find_duplicates("", fingerprint=flip_bits(base, 0, 16, 32, 48)) == []
+
+
+def test_empty_text_is_never_a_duplicate():
+    index = NearDuplicateIndex()
+    index.add("a", "")
+    index.add("b", "")
+    assert index.find_duplicates("") == []
+    assert index.cluster_members("a") == ["a"]
+
+
+def test_adding_an_indexed_id_is_a_no_op():
+    index = NearDuplicateIndex()
+    index.add("a", STORY, score=1)
+    assert index.add("a", "Completely different text", score=100) == "a"
+    assert index.scores["a"] == 1
+
+
+def test_update_score_repicks_canonical():
+    index = NearDuplicateIndex()
+    index.add("a", STORY, score=10)
+    index.add("b", STORY + "!", score=5)
+    index.add("c", STORY + "?", score=1)
+    assert index.canonical_id("c") == "a"
+
+    assert index.update_score("c", 20) == "c"
+    assert index.canonical_id("a") == "c"
+
+    # Dropping the canonical hands the cluster to the next best member
+    assert index.update_score("c", 0) == "a"
+    assert index.canonical_id("b") == "a"
+
+
+def test_update_score_keeps_canonical_on_tie():
+    index = NearDuplicateIndex()
+    index.add("a", STORY, score=10)
+    index.add("b", STORY + "!", score=5)
+    assert index.update_score("b", 10) == "a"
+
+
+def test_update_score_of_unknown_id():
+    index = NearDuplicateIndex()
+    assert index.update_score("missing", 3) == "missing"
+    assert "missing" not in index.scores
+
+
+def test_pickle_round_trip():
+    index = NearDuplicateIndex()
+    index.add("a", STORY, score=10)
+    index.add("b", STORY + "!", score=50)
+
+    restored = pickle.loads(pickle.dumps(index))
+    assert restored.canonical_id("a") == "b"
+    assert sorted(restored.find_duplicates(STORY)) == ["a", "b"]
+    assert restored.add("c", STORY + "?", score=1) == "b"
+
+
+def test_chained_near_duplicate_is_found_through_shared_band():
+    # C is 3 bits from D and shares only band 0 with it; E is 3 bits from C
+    # (sharing only band 0 with C) and 6 bits from D
+    index = NearDuplicateIndex(max_distance=3)
+    d = text_fingerprint(STORY)
+    c = flip_bits(d, 16, 32, 48)
+    e = flip_bits(c, 17, 33, 49)
+    index.add("D", "", score=3, fingerprint=d)
+    index.add("C", "", score=2, fingerprint=c)
+
+    assert index.find_duplicates("", fingerprint=e) == ["C"]
+    assert index.add("E", "", score=1, fingerprint=e) == "D"
+    assert index.cluster_members("E") == ["C", "D", "E"]
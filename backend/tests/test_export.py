@@ -0,0 +1,122 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import export_service
+from export_service import CSV_COLUMNS, iter_csv, iter_ndjson, iter_parquet
+from models import ContentType, EngagementMetrics, Platform, ViralContent
+
+
+def make_content(index: int, title: str = "", age_days: int = 1, platform: Platform = Platform.REDDIT) -> ViralContent:
+    return ViralContent(
+        id=f"item-{index}",
+        title=title or f"Story {index} about a completely separate subject number {index}",
+        platform=platform,
+        content_type=ContentType.POST,
+        url=f"https://example.com/{index}",
+        content_text=f"Body, with \"quotes\" and commas {index}",
+        author="alice",
+        published_date=datetime(2024, 5, 1, 12, 0) if index % 2 else None,
+        scraped_date=datetime.now() - timedelta(days=age_days),
+        engagement_metrics=EngagementMetrics(views=100 + index, likes=index, engagement_rate=0.5),
+        viral_score=float(index),
+        tags=["python", "tips"]
+    )
+
+
+def records(count: int):
+    return [make_content(index).dict() for index in range(count)]
+
+
+@pytest.fixture
+def small_batches(monkeypatch):
+    monkeypatch.setattr(export_service, "BATCH_SIZE", 3)
+
+
+def test_ndjson_streams_one_chunk_per_batch(small_batches):
+    chunks = list(iter_ndjson(records(7)))
+
+    assert len(chunks) == 3
+    lines = b"".join(chunks).decode("utf-8").splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [f"item-{index}" for index in range(7)]
+
+    first = json.loads(lines[1])
+    assert first["platform"] == "reddit"
+    assert first["published_date"] == "2024-05-01T12:00:00"
+    assert first["engagement_metrics"]["views"] == 101
+    assert first["tags"] == ["python", "tips"]
+
+
+def test_ndjson_of_nothing_is_empty():
+    assert list(iter_ndjson([])) == []
+
+
+def test_csv_has_header_and_flattened_metrics(small_batches):
+    chunks = list(iter_csv(records(4)))
+
+    assert len(chunks) == 2
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))
+    assert list(rows[0]) == CSV_COLUMNS
+    assert [row["id"] for row in rows] == ["item-0", "item-1", "item-2", "item-3"]
+    assert rows[1]["content_text"] == 'Body, with "quotes" and commas 1'
+    assert rows[1]["likes"] == "1"
+    assert rows[1]["tags"] == "python|tips"
+    assert rows[0]["published_date"] == ""
+
+
+def test_parquet_writes_one_row_group_per_batch(small_batches):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    chunks = list(iter_parquet(records(7)))
+    assert len(chunks) == 3
+    parquet_file = pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+    assert parquet_file.metadata.num_row_groups == 3
+    assert [parquet_file.metadata.row_group(group).num_rows for group in range(3)] == [3, 3, 1]
+
+    table = parquet_file.read()
+    assert table.column("id").to_pylist() == [f"item-{index}" for index in range(7)]
+    assert table.column("published_date").to_pylist()[:2] == [None, datetime(2024, 5, 1, 12, 0)]
+    assert table.column("tags").to_pylist()[0] == ["python", "tips"]
+    assert table.column("viral_score").to_pylist()[6] == 6.0
+
+
+def test_parquet_of_nothing_is_a_valid_empty_file():
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    table = pq.read_table(io.BytesIO(b"".join(iter_parquet([]))))
+    assert table.num_rows == 0
+    assert "viral_score" in table.column_names
+
+
+def test_iter_contents_filters_hot_and_archived_rows(content_service):
+    with content_service._exclusive():
+        content_service._ingest([
+            make_content(1, age_days=1),
+            make_content(2, age_days=60),
+            make_content(3, age_days=60, platform=Platform.GOOGLE),
+        ])
+    content_service.retention_keep_score = 100
+    assert content_service.compact() == 2
+
+    assert [content["id"] for content in content_service.iter_contents()] == ["item-1"]
+    exported = [content["id"] for content in content_service.iter_contents(include_archive=True)]
+    assert sorted(exported) == ["item-1", "item-2", "item-3"]
+    assert [content["id"] for content in content_service.iter_contents(Platform.GOOGLE, include_archive=True)] == ["item-3"]
+    assert sorted(content["id"] for content in content_service.iter_contents(min_viral_score=2, include_archive=True)) == [
+        "item-2", "item-3"
+    ]
+
+
+def test_dedupe_drops_archived_repeats_of_hot_stories(content_service):
+    story = "Huge news about the new phone release today everyone is talking about"
+    with content_service._exclusive():
+        content_service._ingest([make_content(1, story, age_days=1), make_content(2, story + "!", age_days=60),
+                                 make_content(3, age_days=60)])
+    content_service.retention_keep_score = 100
+    content_service.compact()
+
+    exported = [content["id"] for content in content_service.iter_contents(dedupe=True, include_archive=True)]
+    assert sorted(exported) == ["item-1", "item-3"]
@@ -0,0 +1,91 @@
+from datetime import datetime
+
+import pytest
+
+from ai_service import AIAnalysisService, EMOTIONAL_TRIGGERS, KEYWORD_TABLES, KeywordMatcher, keyword_matcher
+from models import ContentType, EngagementMetrics, Platform, ViralContent
+
+TITLES = [
+    "How I learned programming in 30 days",
+    "Shocking truth about AI and machine learning",
+    "Why your business fails: 5 mistakes to avoid",
+    "Artificial intelligence breakthrough revealed",
+    "Coding bootcamp success story",
+    "Outrage as scandal exposed at tech giant",
+    "Nothing to see here",
+    "Said the maid: chairs and stairs",
+    "",
+]
+
+
+def make_content(index: int, title: str, platform: Platform = Platform.REDDIT) -> ViralContent:
+    return ViralContent(
+        id=f"content-{index}",
+        title=title,
+        platform=platform,
+        content_type=ContentType.POST,
+        url=f"https://example.com/{index}",
+        scraped_date=datetime(2024, 5, 2, 8, 0),
+        engagement_metrics=EngagementMetrics(views=1000, likes=50, comments=120 if index % 2 else 3),
+        viral_score=[95.0, 70.0, 40.0][index % 3]
+    )
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    return AIAnalysisService()
+
+
+def without_dates(briefs):
+    return [brief.dict(exclude={"generated_date"}) for brief in briefs]
+
+
+@pytest.mark.parametrize("title", TITLES)
+def test_matcher_agrees_with_substring_checks(title):
+    title_lower = title.lower()
+    expected = {table for table, words in KEYWORD_TABLES.items() if any(word in title_lower for word in words)}
+    assert keyword_matcher.match(title_lower) == expected
+
+
+@pytest.mark.parametrize("title", TITLES)
+def test_emotional_trigger_matches_first_table_in_order(service, title):
+    # The per-item analyser took the first emotion whose words appeared in the title
+    title_lower = title.lower()
+    expected = next((emotion for emotion, words in EMOTIONAL_TRIGGERS.items()
+                     if any(word in title_lower for word in words)), 'curiosity')
+
+    analysis = service._smart_fallback_analysis(make_content(0, title))
+    assert analysis.viral_patterns.emotional_trigger == expected
+
+
+def test_matcher_reports_keywords_that_are_prefixes_or_overlaps():
+    matcher = KeywordMatcher({"short": ["ai"], "long": ["aim", "maid"]})
+    assert matcher.match("maid") == {"short", "long"}
+    assert matcher.match("aim") == {"short", "long"}
+    assert matcher.match("a i") == set()
+
+
+def test_analysis_batch_equals_per_item_analysis(service):
+    contents = [make_content(index, title, platform) for index, (title, platform) in
+                enumerate(zip(TITLES, list(Platform) * 3))]
+
+    assert service.analyze_batch(contents) == [service._smart_fallback_analysis(content) for content in contents]
+
+
+def test_analysis_is_deterministic_per_content_id(service):
+    contents = [make_content(index, title) for index, title in enumerate(TITLES)]
+
+    first = service.analyze_batch(contents)
+    assert AIAnalysisService().analyze_batch(list(reversed(contents))) == list(reversed(first))
+
+
+def test_brief_batch_equals_per_item_briefs(service):
+    contents = [make_content(index, title) for index, title in enumerate(TITLES)]
+    analyses = service.analyze_batch(contents)
+
+    batch = service.generate_brief_batch(contents, analyses)
+    single = [service._smart_brief_generation(content, analysis) for content, analysis in zip(contents, analyses)]
+    assert without_dates(batch) == without_dates(single)
+    assert without_dates(service.generate_brief_batch(contents, analyses)) == without_dates(batch)
+
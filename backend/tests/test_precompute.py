@@ -0,0 +1,154 @@
+from datetime import datetime
+
+import pytest
+
+from ai_service import AIAnalysisService
+from models import ContentType, EngagementMetrics, Platform, ViralContent
+from precompute import InsightPrecomputer
+
+
+class FakeAIService(AIAnalysisService):
+    """Rule-based analyser that can pretend OpenAI is configured, so calls are charged"""
+
+    def __init__(self, use_openai: bool):
+        super().__init__()
+        self.use_openai = use_openai
+
+    def _use_openai(self) -> bool:
+        return self.use_openai
+
+    def analyze_viral_content(self, content):
+        self.analysis_count += 1
+        return self._smart_fallback_analysis(content)
+
+    def generate_content_brief(self, content, analysis):
+        self.brief_count += 1
+        return self._smart_brief_generation(content, analysis)
+
+
+def make_content(index: int, score: float = 50.0) -> ViralContent:
+    return ViralContent(
+        id=f"item-{index}",
+        title=f"How to learn programming fast, part {index}",
+        platform=Platform.REDDIT,
+        content_type=ContentType.POST,
+        url=f"https://example.com/{index}",
+        scraped_date=datetime(2024, 5, 2, 8, 0),
+        engagement_metrics=EngagementMetrics(views=100),
+        viral_score=score
+    )
+
+
+def make_precomputer(use_openai: bool = False, **kwargs) -> InsightPrecomputer:
+    return InsightPrecomputer(FakeAIService(use_openai), cost_per_call=0.5, **kwargs)
+
+
+def test_on_ingest_warms_top_items_in_the_background():
+    precomputer = make_precomputer(top_n=2)
+    precomputer.on_ingest([make_content(index, score) for index, score in enumerate([10, 90, 50])])
+    precomputer.executor.shutdown(wait=True)
+
+    assert set(precomputer.briefs) == {"item-1", "item-2"}
+    assert precomputer.warmed == 2
+    assert precomputer.ai_service.analysis_count == 2
+    assert precomputer.ai_service.brief_count == 2
+
+
+def test_disabled_precomputer_does_nothing():
+    precomputer = make_precomputer(top_n=0)
+    precomputer.on_ingest([make_content(1)])
+    precomputer.executor.shutdown(wait=True)
+    assert not precomputer.enabled
+    assert precomputer.warmed == 0
+
+
+def test_warm_and_cache_hits_are_counted_separately():
+    precomputer = make_precomputer()
+    precomputer._warm([make_content(1)])
+
+    precomputer.get_analysis(make_content(1))
+    precomputer.get_brief(make_content(1))
+    precomputer.get_analysis(make_content(2))
+    precomputer.get_analysis(make_content(2))
+
+    stats = precomputer.get_stats()
+    assert (stats["requests"], stats["warm_hits"], stats["cache_hits"]) == (4, 2, 1)
+    assert stats["warm_hit_rate"] == 0.5
+    assert stats["request_calls"] == 1
+
+
+def test_brief_miss_reuses_the_cached_analysis_without_counting_a_request():
+    precomputer = make_precomputer()
+    analysis = precomputer.get_analysis(make_content(1))
+
+    brief = precomputer.get_brief(make_content(1))
+    assert brief.original_content_id == "item-1"
+    assert precomputer.get_analysis(make_content(1)) is analysis
+    assert precomputer.ai_service.analysis_count == 1
+    assert precomputer.get_stats()["requests"] == 3
+
+
+def test_fallback_calls_are_free():
+    precomputer = make_precomputer(daily_budget=0.0)
+    precomputer._warm([make_content(1), make_content(2)])
+
+    assert precomputer.warmed == 2
+    assert precomputer.spent_today == 0.0
+
+
+def test_warming_stops_when_the_daily_budget_is_spent():
+    # Each warmed item costs one analysis and one brief
+    precomputer = make_precomputer(use_openai=True, daily_budget=2.0)
+    precomputer._warm([make_content(index) for index in range(4)])
+
+    stats = precomputer.get_stats()
+    assert stats["warmed"] == 2
+    assert stats["skipped_for_budget"] == 2
+    assert stats["spent_today"] == 2.0
+
+
+def test_request_path_calls_are_charged_even_over_budget():
+    precomputer = make_precomputer(use_openai=True, daily_budget=0.5)
+
+    precomputer.get_brief(make_content(1))
+    stats = precomputer.get_stats()
+    assert stats["request_calls"] == 2
+    assert stats["spent_today"] == pytest.approx(1.0)
+    assert stats["spent_total"] == pytest.approx(1.0)
+
+    # Nothing is left for the warmer
+    precomputer._warm([make_content(2)])
+    assert precomputer.warmed == 0
+
+
+def test_already_warmed_items_are_not_charged_again():
+    precomputer = make_precomputer(use_openai=True, daily_budget=10.0)
+    precomputer._warm([make_content(1)])
+    precomputer._warm([make_content(1)])
+
+    assert precomputer.spent_today == 1.0
+    assert precomputer.warmed == 1
+
+
+def test_cache_is_bounded():
+    precomputer = make_precomputer(max_entries=2)
+    for index in range(3):
+        precomputer.get_analysis(make_content(index))
+    assert list(precomputer.analyses) == ["item-1", "item-2"]
+
+
+def test_fallback_batches_count_every_item(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    service = AIAnalysisService()
+    contents = [make_content(index) for index in range(3)]
+
+    service.generate_brief_batch(contents, service.analyze_batch(contents))
+    assert (service.analysis_count, service.brief_count) == (3, 3)
+
+
+def test_invalidate_drops_insights_for_updated_items():
+    precomputer = make_precomputer()
+    precomputer._warm([make_content(1), make_content(2)])
+
+    precomputer.invalidate(["item-1", "unknown"])
+    assert set(precomputer.analyses) == set(precomputer.briefs) == {"item-2"}
@@ -0,0 +1,97 @@
+import gzip
+import json
+from datetime import datetime
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from models import EngagementMetrics
+from response_cache import ResponseCache, _etag_matches, dumps
+
+ETAG = '"v1-0123456789abcdef"'
+
+
+def test_etag_matches_exact_weak_list_and_wildcard():
+    assert _etag_matches(ETAG, ETAG)
+    assert _etag_matches(f"W/{ETAG}", ETAG)
+    assert _etag_matches(f'"v0-old", {ETAG}', ETAG)
+    assert _etag_matches("*", ETAG)
+
+
+def test_etag_mismatch():
+    assert not _etag_matches(None, ETAG)
+    assert not _etag_matches("", ETAG)
+    assert not _etag_matches('"v2-0123456789abcdef"', ETAG)
+    # Unquoted tags are not the same entity tag
+    assert not _etag_matches(ETAG.strip('"'), ETAG)
+
+
+def make_client(cache: ResponseCache, state: dict) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/items")
+    def items(request: Request):
+        return cache.response(request, ("items",), state["version"], lambda: state["payload"],
+                              headers={"X-Content-Cursor": str(state["version"])})
+
+    return TestClient(app)
+
+
+def test_response_is_cached_until_version_changes():
+    cache = ResponseCache()
+    state = {"version": 1, "payload": {"items": [1, 2]}}
+    client = make_client(cache, state)
+
+    first = client.get("/items")
+    assert first.status_code == 200
+    assert first.json() == {"items": [1, 2]}
+    assert first.headers["X-Content-Cursor"] == "1"
+
+    state["payload"] = {"items": [3]}
+    assert client.get("/items").headers["ETag"] == first.headers["ETag"]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    state["version"] = 2
+    second = client.get("/items")
+    assert second.json() == {"items": [3]}
+    assert second.headers["ETag"] != first.headers["ETag"]
+
+
+def test_matching_if_none_match_gets_304():
+    cache = ResponseCache()
+    state = {"version": 1, "payload": {"items": [1, 2]}}
+    client = make_client(cache, state)
+    etag = client.get("/items").headers["ETag"]
+
+    not_modified = client.get("/items", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+
+    state["version"] = 2
+    assert client.get("/items", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_large_bodies_are_gzipped():
+    cache = ResponseCache()
+    state = {"version": 1, "payload": {"items": list(range(1000))}}
+    client = make_client(cache, state)
+
+    response = client.get("/items", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.json() == state["payload"]
+    assert gzip.decompress(cache.entries[("items",)].encode("gzip")) == cache.entries[("items",)].body
+
+
+def test_lru_evicts_oldest_entry():
+    cache = ResponseCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.get((key,), 1, lambda: {})
+    assert list(cache.entries) == [("b",), ("c",)]
+
+
+def test_dumps_encodes_models_and_dates():
+    payload = {"metrics": EngagementMetrics(views=3), "at": datetime(2024, 1, 2, 3, 4, 5)}
+    decoded = json.loads(dumps(payload))
+    assert decoded["metrics"]["views"] == 3
+    assert decoded["at"] == "2024-01-02T03:04:05"
@@ -0,0 +1,155 @@
+import asyncio
+import time
+
+import pytest
+
+from scheduler_store import SchedulerRunStore
+
+
+@pytest.fixture
+def run_store(tmp_path):
+    return SchedulerRunStore(str(tmp_path / "scheduler_state.db"))
+
+
+@pytest.fixture
+def scheduler(tmp_path, monkeypatch):
+    # Importing the module builds the shared scheduler, which opens its state files in the working directory
+    monkeypatch.chdir(tmp_path)
+    from scheduler import ContentScrapingScheduler
+
+    return ContentScrapingScheduler()
+
+
+class FakeContentService:
+    """Returns a fixed number of new items per platform after a short delay"""
+
+    def __init__(self, new_items_by_platform):
+        self.new_items_by_platform = new_items_by_platform
+
+    def scrape_and_ingest(self, request):
+        time.sleep(0.05)
+        new_items = self.new_items_by_platform[request.platforms[0].value]
+        return [], [object()] * new_items
+
+
+def record_yields(run_store, source, *yields):
+    for offset, new_items in enumerate(yields):
+        run_store.record_run(source, "worker", 1000.0 + offset, 1.0, new_items, "success")
+
+
+def test_lease_is_exclusive_until_released(run_store):
+    assert run_store.try_acquire("reddit", "worker-a", ttl_seconds=60)
+    assert not run_store.try_acquire("reddit", "worker-b", ttl_seconds=60)
+    # Another source and the current holder are not blocked
+    assert run_store.try_acquire("google", "worker-b", ttl_seconds=60)
+    assert run_store.try_acquire("reddit", "worker-a", ttl_seconds=60)
+
+    run_store.release("reddit", "worker-a")
+    assert run_store.try_acquire("reddit", "worker-b", ttl_seconds=60)
+
+
+def test_expired_lease_can_be_taken_over(run_store):
+    assert run_store.try_acquire("reddit", "worker-a", ttl_seconds=-1)
+    assert run_store.try_acquire("reddit", "worker-b", ttl_seconds=60)
+
+
+def test_recent_success_blocks_until_min_gap(run_store):
+    run_store.record_run("reddit", "worker-a", time.time(), 1.0, 3, "success")
+    assert not run_store.try_acquire("reddit", "worker-b", ttl_seconds=60, min_gap_seconds=300)
+    assert run_store.try_acquire("reddit", "worker-b", ttl_seconds=60, min_gap_seconds=0)
+
+
+def test_failed_runs_do_not_count_towards_min_gap_or_yields(run_store):
+    run_store.record_run("reddit", "worker-a", time.time(), 1.0, 0, "error", error="boom")
+    assert run_store.try_acquire("reddit", "worker-b", ttl_seconds=60, min_gap_seconds=300)
+    assert run_store.recent_yields("reddit") == []
+
+
+def test_recent_yields_are_newest_first(run_store):
+    record_yields(run_store, "reddit", 1, 2, 3)
+    assert run_store.recent_yields("reddit", limit=2) == [3, 2]
+
+
+def test_interval_backs_off_while_nothing_is_new(scheduler):
+    from scheduler import INITIAL_INTERVAL_MINUTES, INTERVAL_STEP, MAX_INTERVAL_MINUTES
+
+    record_yields(scheduler.run_store, "reddit", 0, 0, 0)
+    assert scheduler._adapt_interval("reddit") == INITIAL_INTERVAL_MINUTES * INTERVAL_STEP
+    for _ in range(10):
+        scheduler._adapt_interval("reddit")
+    assert scheduler.intervals["reddit"] == MAX_INTERVAL_MINUTES
+
+
+def test_interval_speeds_up_while_yield_is_high(scheduler):
+    from scheduler import HIGH_YIELD_ITEMS, INITIAL_INTERVAL_MINUTES, INTERVAL_STEP, MIN_INTERVAL_MINUTES
+
+    record_yields(scheduler.run_store, "google", HIGH_YIELD_ITEMS, HIGH_YIELD_ITEMS + 5)
+    assert scheduler._adapt_interval("google") == INITIAL_INTERVAL_MINUTES / INTERVAL_STEP
+    for _ in range(10):
+        scheduler._adapt_interval("google")
+    assert scheduler.intervals["google"] == MIN_INTERVAL_MINUTES
+
+
+def test_interval_holds_for_moderate_yield(scheduler):
+    from scheduler import INITIAL_INTERVAL_MINUTES
+
+    record_yields(scheduler.run_store, "bing", 0, 3, 4)
+    assert scheduler._adapt_interval("bing") == INITIAL_INTERVAL_MINUTES
+
+
+def test_concurrent_sources_record_their_own_yield(scheduler):
+    from scheduler import SCRAPE_SOURCES
+
+    scheduler.content_service = FakeContentService({"reddit": 12, "google": 0, "bing": 4})
+
+    async def run_all():
+        await asyncio.gather(*(scheduler.scrape_source_job(source) for source in SCRAPE_SOURCES))
+
+    asyncio.run(run_all())
+    assert {source: scheduler.run_store.recent_yields(source) for source in ("reddit", "google", "bing")} == {
+        "reddit": [12], "google": [0], "bing": [4]
+    }
+
+
+def test_run_is_skipped_while_another_worker_holds_the_lease(scheduler):
+    scheduler.run_store.try_acquire("reddit", "other-worker", ttl_seconds=60)
+
+    assert asyncio.run(scheduler._run_guarded("reddit", 0, lambda: 5)) is None
+    assert scheduler.run_store.recent_runs() == []
+
+
+def test_failed_job_is_recorded_and_releases_the_lease(scheduler):
+    def fail():
+        raise RuntimeError("scraper down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(scheduler._run_guarded("reddit", 0, fail))
+
+    run = scheduler.run_store.recent_runs()[0]
+    assert (run["status"], run["error"]) == ("error", "scraper down")
+    assert scheduler.run_store.try_acquire("reddit", "other-worker", ttl_seconds=60)
+
+
+def test_follower_reloads_store_saved_by_another_worker(content_service):
+    from datetime import datetime
+
+    from content_service import ContentService
+    from models import ContentType, EngagementMetrics, Platform, ViralContent
+
+    follower = ContentService()
+    follower.load()
+    version = follower.version
+    assert not follower.sync_from_disk()
+
+    with content_service._exclusive():
+        content_service._ingest([ViralContent(
+            id="new", title="Fresh story", platform=Platform.REDDIT, content_type=ContentType.POST,
+            url="https://example.com/new", scraped_date=datetime.now(),
+            engagement_metrics=EngagementMetrics(views=10), viral_score=12.0
+        )])
+
+    assert follower.sync_from_disk()
+    assert follower.store.ids == ["new"]
+    assert "new" in follower.vector_index
+    assert [item["id"] for item in follower.change_feed.since(version)[0]["added"]] == ["new"]
+    assert not follower.sync_from_disk()
@@ -0,0 +1,142 @@
+import pickle
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import Platform
+from trend_stats import ScoreHistogram, TOP_TAGS, TrendAggregates
+
+NOW = datetime(2024, 6, 30, 12, 30)
+
+
+def make_record(content_id: str, score: float, hours_ago: float = 1, platform: Platform = Platform.REDDIT,
+                tags=("python",)):
+    return {
+        "id": content_id,
+        "platform": platform,
+        "viral_score": score,
+        "scraped_date": NOW - timedelta(hours=hours_ago),
+        "tags": list(tags),
+    }
+
+
+def test_histogram_percentiles_use_bin_midpoints():
+    histogram = ScoreHistogram()
+    for score in range(1, 101):
+        histogram.add(float(score))
+
+    summary = histogram.summary()
+    assert summary["count"] == 100
+    assert summary["mean"] == pytest.approx(50.5)
+    assert summary["p50"] == 50.5
+    assert summary["p90"] == 90.5
+    assert histogram.percentile(100) == 100.0
+
+
+def test_histogram_clamps_out_of_range_scores():
+    histogram = ScoreHistogram()
+    histogram.add(-5.0)
+    histogram.add(250.0)
+    assert histogram.bins[0] == 1 and histogram.bins[-1] == 1
+
+
+def test_empty_histogram_has_no_percentiles():
+    assert ScoreHistogram().summary() == {"count": 0, "mean": None, "p50": None, "p90": None, "p99": None}
+
+
+def test_add_then_remove_restores_the_summary():
+    stats = TrendAggregates()
+    base = [make_record("a", 10), make_record("b", 80, platform=Platform.GOOGLE, tags=("ai",))]
+    for record in base:
+        stats.add(record)
+    stats.refresh(NOW)
+    before = {key: value for key, value in stats.summary.items() if key != "computed_at"}
+
+    extra = make_record("c", 55, tags=("python", "ai"))
+    stats.add(extra)
+    stats.refresh(NOW)
+    assert stats.summary["total_content"] == 3
+    assert stats.summary["tags"]["python"]["count"] == 2
+
+    stats.remove(extra)
+    stats.refresh(NOW)
+    assert {key: value for key, value in stats.summary.items() if key != "computed_at"} == before
+
+
+def test_summary_groups_by_platform_tag_and_hour():
+    stats = TrendAggregates()
+    stats.add(make_record("a", 20, hours_ago=0.25))
+    stats.add(make_record("b", 40, hours_ago=0.25, platform=Platform.BING, tags=("Python", "news")))
+    stats.add(make_record("c", 60, hours_ago=3))
+    stats.refresh(NOW)
+
+    summary = stats.summary
+    assert summary["platform_distribution"] == {"reddit": 2, "bing": 1}
+    assert summary["platforms"]["reddit"]["mean"] == 40.0
+    # Tags are case-insensitive
+    assert summary["tags"]["python"]["count"] == 3
+    assert summary["hours"]["2024-06-30T12:00"]["count"] == 2
+    assert summary["hours"]["2024-06-30T09:00"]["count"] == 1
+
+
+def test_removed_groups_disappear_after_refresh():
+    stats = TrendAggregates()
+    record = make_record("a", 20, platform=Platform.YOUTUBE, tags=("music",))
+    stats.add(record)
+    stats.remove(record)
+    stats.refresh(NOW)
+
+    assert stats.summary["total_content"] == 0
+    assert "youtube" not in stats.summary["platforms"]
+    assert "music" not in stats.summary["tags"]
+    assert stats.summary["rising_tags"] == []
+
+
+def test_rising_tags_compare_the_last_two_windows():
+    stats = TrendAggregates()
+    for index in range(3):
+        stats.add(make_record(f"new-{index}", 50, hours_ago=2, tags=("ai",)))
+    stats.add(make_record("old-ai", 50, hours_ago=30, tags=("ai",)))
+    for index in range(3):
+        stats.add(make_record(f"old-{index}", 50, hours_ago=30, tags=("crypto",)))
+    stats.add(make_record("new-crypto", 50, hours_ago=2, tags=("crypto",)))
+    stats.add(make_record("fresh", 50, hours_ago=1, tags=("brand-new",)))
+    stats.refresh(NOW)
+
+    rising = stats.summary["rising_tags"]
+    assert [item["tag"] for item in rising] == ["ai", "brand-new"]
+    assert rising[0] == {"tag": "ai", "current_window": 3, "previous_window": 1, "growth": 2.0}
+    assert rising[1]["growth"] == 2.0 and rising[1]["current_window"] == 1
+
+
+def test_rising_tags_are_capped():
+    stats = TrendAggregates()
+    for index in range(TOP_TAGS + 5):
+        stats.add(make_record(f"item-{index}", 50, tags=(f"tag-{index}",)))
+    stats.refresh(NOW)
+    assert len(stats.summary["rising_tags"]) == TOP_TAGS
+
+
+def test_old_hour_buckets_are_pruned_and_skipped_on_remove():
+    stats = TrendAggregates()
+    old = make_record("old", 30, hours_ago=24 * 8)
+    stats.add(old)
+    stats.refresh(NOW)
+    assert stats.summary["hours"] == {}
+
+    stats.remove(old)
+    stats.refresh(NOW)
+    assert stats.summary["total_content"] == 0
+    assert stats.hours == {}
+
+
+def test_pickle_round_trip_keeps_rollups_and_recreates_the_lock():
+    stats = TrendAggregates()
+    stats.add(make_record("a", 10))
+    stats.refresh(NOW)
+
+    restored = pickle.loads(pickle.dumps(stats))
+    assert restored.summary == stats.summary
+    restored.add(make_record("b", 20))
+    restored.refresh(NOW)
+    assert restored.summary["total_content"] == 2
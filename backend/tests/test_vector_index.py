@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from vector_index import HashingVectorizer, VectorIndex
+
+DOCUMENTS = [
+    ("py-1", "Python tips for faster data processing", "Use numpy arrays and vectorised loops", ["python"]),
+    ("py-2", "Faster data processing in Python", "Numpy arrays beat plain loops", ["python"]),
+    ("py-3", "Python data processing with pandas", "Dataframes and numpy arrays", ["python"]),
+    ("cook-1", "Best sourdough bread recipe", "Flour, water, salt and a starter", ["cooking"]),
+    ("cook-2", "Easy sourdough starter at home", "Feed the starter flour and water daily", ["cooking"]),
+    ("car-1", "Electric cars charging network expands", "New fast chargers along highways", ["cars"]),
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = VectorIndex(str(tmp_path / "vectors.npy"))
+    index.add_batch(DOCUMENTS)
+    index.flush()
+    return index
+
+
+def test_vectorizer_is_deterministic():
+    vectorizer = HashingVectorizer(dim=64)
+    documents = [(title, text, tags) for _, title, text, tags in DOCUMENTS]
+
+    matrix = vectorizer.transform(documents)
+    assert matrix.shape == (len(DOCUMENTS), 64)
+    assert np.array_equal(matrix, HashingVectorizer(dim=64).transform(documents))
+
+
+def test_similar_ranks_same_topic_first(index):
+    results = index.similar("py-1", k=2)
+
+    scores = [score for _, score in results]
+    assert scores == sorted(scores, reverse=True)
+    assert {content_id for content_id, _ in results} == {"py-2", "py-3"}
+    assert all(-1.0 <= score <= 1.0 for _, score in results)
+
+
+def test_similar_never_returns_the_query(index):
+    assert "cook-1" not in [content_id for content_id, _ in index.similar("cook-1", k=len(DOCUMENTS))]
+    assert len(index.similar("cook-1", k=len(DOCUMENTS))) == len(DOCUMENTS) - 1
+
+
+def test_similar_unknown_id(index):
+    assert index.similar("missing") == []
+
+
+def test_include_filters_before_picking_top_k(index):
+    results = index.similar("py-1", k=2, include=lambda content_id: content_id != "py-2")
+
+    assert len(results) == 2
+    assert "py-2" not in [content_id for content_id, _ in results]
+    assert results[0][0] == "py-3"
+
+
+def test_adding_known_ids_is_a_no_op(index):
+    index.add_batch(DOCUMENTS[:2])
+    assert len(index) == len(DOCUMENTS)
+
+
+def test_reload_from_disk(index, tmp_path):
+    reloaded = VectorIndex(str(tmp_path / "vectors.npy"))
+
+    assert reloaded.ids == index.ids
+    assert reloaded.doc_count == index.doc_count
+    assert reloaded.similar("py-1", k=2) == index.similar("py-1", k=2)
+
+
+def test_unflushed_rows_are_dropped_on_reload(index, tmp_path):
+    index.add_batch([("late", "Unflushed item about gardening", "", [])])
+
+    reloaded = VectorIndex(str(tmp_path / "vectors.npy"))
+    assert len(reloaded) == len(DOCUMENTS)
+    assert "late" not in reloaded
+
+
+def test_move_to_replaces_the_target_index(index, tmp_path):
+    rebuilt = VectorIndex(str(tmp_path / "rebuilt.npy"))
+    rebuilt.add_batch(DOCUMENTS[3:])
+    rebuilt.flush()
+
+    rebuilt.move_to(index.path)
+    assert not (tmp_path / "rebuilt.npy").exists()
+    assert rebuilt.similar("cook-1", k=1)[0][0] == "cook-2"
+
+    reloaded = VectorIndex(str(tmp_path / "vectors.npy"))
+    assert reloaded.ids == ["cook-1", "cook-2", "car-1"]
+
+
+def test_clear_removes_files(index, tmp_path):
+    index.clear()
+
+    assert len(index) == 0
+    assert not (tmp_path / "vectors.npy").exists()
+    assert len(VectorIndex(str(tmp_path / "vectors.npy"))) == 0
@@ -0,0 +1,186 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from archive_store import as_datetime
+
+SCORE_BINS = 101
+PERCENTILES = (50, 90, 99)
+HOUR_BUCKET_RETENTION = timedelta(days=7)
+RISING_WINDOW = timedelta(hours=24)
+TOP_TAGS = 20
+# Sliding windows move even without ingest, so the summary is recomputed at least this often
+REFRESH_INTERVAL = timedelta(minutes=10)
+
+
+def _hour_key(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:00")
+
+
+class ScoreHistogram:
+    """Fixed 1-point-wide bins over the 0-100 viral score range.
+
+    Adding and removing are O(1) and percentiles are O(bins), so a rollup never
+    needs to rescan the items it summarises.
+    """
+
+    def __init__(self):
+        self.bins = [0] * SCORE_BINS
+        self.count = 0
+        self.total = 0.0
+
+    def _bin(self, score: float) -> int:
+        return max(0, min(int(score), SCORE_BINS - 1))
+
+    def add(self, score: float):
+        self.bins[self._bin(score)] += 1
+        self.count += 1
+        self.total += score
+
+    def remove(self, score: float):
+        self.bins[self._bin(score)] -= 1
+        self.count -= 1
+        self.total -= score
+
+    def percentile(self, p: float) -> Optional[float]:
+        if self.count <= 0:
+            return None
+        threshold = self.count * p / 100
+        cumulative = 0
+        for index, bin_count in enumerate(self.bins):
+            cumulative += bin_count
+            if cumulative >= threshold:
+                # Midpoint of the bin (the top bin only holds exactly 100)
+                return min(index + 0.5, 100.0)
+        return 100.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count > 0 else None,
+            **{f"p{p}": self.percentile(p) for p in PERCENTILES}
+        }
+
+
+class TrendAggregates:
+    """Rollups of the hot store maintained incrementally at ingest and compaction.
+
+    Items update per-platform, per-tag and per-hour histograms plus hourly tag
+    counts. refresh() rebuilds the served summary once per change, so reading
+    /stats does not depend on the corpus size.
+    """
+
+    def __init__(self):
+        self.overall = ScoreHistogram()
+        self.platforms: Dict[str, ScoreHistogram] = {}
+        self.tags: Dict[str, ScoreHistogram] = {}
+        self.hours: Dict[str, ScoreHistogram] = {}
+        self.tag_hours: Dict[str, Dict[str, int]] = {}
+        self.summary: Dict[str, Any] = {}
+        self.refreshed_at = datetime.min
+        # Ingest updates the rollups on a worker thread while requests may refresh them
+        self.lock = threading.RLock()
+        self.refresh()
+
+    def _apply(self, content: Dict[str, Any], sign: int):
+        score = content.get("viral_score") or 0.0
+        platform = getattr(content.get("platform"), "value", content.get("platform"))
+        tags = {tag.lower() for tag in content.get("tags") or []}
+        scraped = as_datetime(content.get("scraped_date"))
+        hour = _hour_key(scraped) if scraped else None
+
+        histograms = [self.overall, self.platforms.setdefault(platform, ScoreHistogram())]
+        histograms += [self.tags.setdefault(tag, ScoreHistogram()) for tag in tags]
+        # Hour buckets past retention are pruned, so removals skip them
+        if hour and (sign > 0 or hour in self.hours):
+            histograms.append(self.hours.setdefault(hour, ScoreHistogram()))
+        for histogram in histograms:
+            if sign > 0:
+                histogram.add(score)
+            else:
+                histogram.remove(score)
+
+        if hour:
+            for tag in tags:
+                tag_hours = self.tag_hours.setdefault(tag, {})
+                tag_hours[hour] = tag_hours.get(hour, 0) + sign
+                if tag_hours[hour] <= 0:
+                    del tag_hours[hour]
+
+    # Locks cannot be pickled into the store snapshot
+    def __getstate__(self):
+        with self.lock:
+            state = dict(self.__dict__)
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
+    def add(self, content: Dict[str, Any]):
+        with self.lock:
+            self._apply(content, 1)
+
+    def remove(self, content: Dict[str, Any]):
+        with self.lock:
+            self._apply(content, -1)
+
+    def _prune(self, now: datetime):
+        oldest = _hour_key(now - HOUR_BUCKET_RETENTION)
+        for hour in [hour for hour in self.hours if hour < oldest]:
+            del self.hours[hour]
+        for tag in list(self.tag_hours):
+            for hour in [hour for hour in self.tag_hours[tag] if hour < oldest]:
+                del self.tag_hours[tag][hour]
+            if not self.tag_hours[tag]:
+                del self.tag_hours[tag]
+        for groups in (self.platforms, self.tags):
+            for key in [key for key, histogram in groups.items() if histogram.count <= 0]:
+                del groups[key]
+
+    def _rising_tags(self, now: datetime) -> List[Dict[str, Any]]:
+        current_start = _hour_key(now - RISING_WINDOW)
+        previous_start = _hour_key(now - 2 * RISING_WINDOW)
+
+        rising = []
+        for tag, hours in self.tag_hours.items():
+            current = sum(count for hour, count in hours.items() if hour >= current_start)
+            previous = sum(count for hour, count in hours.items() if previous_start <= hour < current_start)
+            if current > previous:
+                # Add-one smoothing so brand new tags do not divide by zero
+                rising.append({
+                    "tag": tag,
+                    "current_window": current,
+                    "previous_window": previous,
+                    "growth": (current + 1) / (previous + 1)
+                })
+        rising.sort(key=lambda item: (item["growth"], item["current_window"]), reverse=True)
+        return rising[:TOP_TAGS]
+
+    def refresh(self, now: Optional[datetime] = None):
+        """Recompute the served summary; called after each batch of changes"""
+        now = now or datetime.now()
+        with self.lock:
+            self.refreshed_at = now
+            self._prune(now)
+            self.summary = self._summarise(now)
+
+    def _summarise(self, now: datetime) -> Dict[str, Any]:
+        top_tags = sorted(self.tags.items(), key=lambda item: item[1].count, reverse=True)[:TOP_TAGS]
+        return {
+            "total_content": self.overall.count,
+            "platform_distribution": {platform: histogram.count for platform, histogram in self.platforms.items()},
+            "scores": self.overall.summary(),
+            "platforms": {platform: histogram.summary() for platform, histogram in self.platforms.items()},
+            "tags": {tag: histogram.summary() for tag, histogram in top_tags},
+            "hours": {hour: histogram.summary() for hour, histogram in sorted(self.hours.items())},
+            "rising_tags": self._rising_tags(now),
+            "window_hours": RISING_WINDOW.total_seconds() / 3600,
+            "computed_at": now.isoformat()
+        }
+
+    def current_summary(self) -> Dict[str, Any]:
+        if datetime.now() - self.refreshed_at > REFRESH_INTERVAL:
+            self.refresh()
+        return self.summary
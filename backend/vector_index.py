@@ -0,0 +1,278 @@
+import hashlib
+import json
+import math
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from dedup_index import normalize_text
+
+
+def _index_paths(path: str) -> Tuple[str, str, str]:
+    """Matrix, metadata and ids files of the index stored at path"""
+    stem = os.path.splitext(path)[0]
+    return path, stem + ".json", stem + ".ids"
+
+
+class HashingVectorizer:
+    """Stateless feature hashing of unigrams, bigrams and tags into a fixed-width vector"""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def features(self, title: str, content_text: Optional[str], tags: List[str]) -> Dict[int, float]:
+        tokens = normalize_text(f"{title} {content_text or ''}")
+        terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        terms += [f"tag:{tag.lower()}" for tag in tags or []]
+
+        counts: Dict[int, float] = {}
+        for term in terms:
+            digest = int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "big")
+            bucket = digest % self.dim
+            sign = 1.0 if digest >> 63 else -1.0
+            counts[bucket] = counts.get(bucket, 0.0) + sign
+        return counts
+
+    def transform(self, documents: List[Tuple[str, Optional[str], List[str]]]) -> np.ndarray:
+        """Sublinear term-frequency matrix for a batch of (title, content_text, tags)"""
+        rows, columns, values = [], [], []
+        for row, (title, content_text, tags) in enumerate(documents):
+            for bucket, count in self.features(title, content_text, tags).items():
+                if count:
+                    rows.append(row)
+                    columns.append(bucket)
+                    values.append(math.copysign(1.0 + math.log(abs(count)), count))
+
+        matrix = np.zeros((len(documents), self.dim), dtype=np.float32)
+        matrix[rows, columns] = values
+        return matrix
+
+
+class VectorIndex:
+    """Memory-mapped TF-IDF embedding matrix with a random-hyperplane LSH index.
+
+    Vectors are L2-normalised float16 rows appended in batches to a ``.npy`` file
+    opened with ``np.lib.format.open_memmap``. Each of ``tables`` hash tables keys
+    rows by the sign pattern of ``bits`` random projections; queries rerank the
+    union of their buckets with exact cosine similarity and fall back to a full
+    scan when the buckets are too sparse to fill ``k`` results.
+
+    Row ids are appended to a ``.ids`` sidecar as rows are added, and the small
+    ``.json`` metadata (row count and document frequencies) is only written by
+    flush(), once per embedding pass.
+    """
+
+    def __init__(self, path: str = "vector_index.npy", dim: int = 256, tables: int = 8, bits: int = 14, seed: int = 7):
+        self.path, self.meta_path, self.ids_path = _index_paths(path)
+        self.vectorizer = HashingVectorizer(dim)
+        self.dim = dim
+        self.tables = tables
+        self.bits = bits
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((dim, tables * bits)).astype(np.float32)
+        self.bit_weights = (1 << np.arange(bits, dtype=np.int64))
+
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.doc_freq = np.zeros(dim, dtype=np.int64)
+        self.doc_count = 0
+        self.matrix: Optional[np.memmap] = None
+        self.buckets: List[Dict[int, List[int]]] = [{} for _ in range(tables)]
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, content_id: str) -> bool:
+        return content_id in self.rows
+
+    def _load(self):
+        if not (os.path.exists(self.path) and os.path.exists(self.meta_path)):
+            # Drop leftovers of a first pass that never flushed
+            self.clear()
+            return
+        with open(self.meta_path, "r") as f:
+            meta = json.load(f)
+        if meta.get("dim") != self.dim:
+            print(f"Vector index dimension changed, rebuilding {self.path}")
+            self.clear()
+            return
+
+        if "ids" in meta:
+            # Older indexes kept every id inside the metadata file
+            ids = meta["ids"]
+            self._write_ids(ids)
+        else:
+            ids = self._read_ids()
+        count = meta.get("count", len(ids))
+        if len(ids) < count:
+            print(f"Vector index ids are incomplete, rebuilding {self.path}")
+            self.clear()
+            return
+        if len(ids) > count:
+            # Ids appended by a pass that stopped before flushing its metadata
+            ids = ids[:count]
+            self._write_ids(ids)
+
+        self.ids = ids
+        self.rows = {content_id: row for row, content_id in enumerate(self.ids)}
+        self.doc_freq = np.asarray(meta["doc_freq"], dtype=np.int64)
+        self.doc_count = meta["doc_count"]
+        self.matrix = np.load(self.path, mmap_mode="r+")
+
+        for start in range(0, len(self.ids), 65536):
+            stop = min(start + 65536, len(self.ids))
+            self._add_to_buckets(start, np.asarray(self.matrix[start:stop], dtype=np.float32))
+
+    def _read_ids(self) -> List[str]:
+        if not os.path.exists(self.ids_path):
+            return []
+        with open(self.ids_path, "r") as f:
+            return f.read().splitlines()
+
+    def _write_ids(self, ids: List[str]):
+        with open(self.ids_path, "w") as f:
+            f.write("".join(f"{content_id}\n" for content_id in ids))
+
+    def _save_meta(self):
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "dim": self.dim,
+                "count": len(self.ids),
+                "doc_freq": self.doc_freq.tolist(),
+                "doc_count": self.doc_count
+            }, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def flush(self):
+        """Persist the vectors and metadata of every row added so far"""
+        if self.matrix is not None:
+            self.matrix.flush()
+        self._save_meta()
+
+    def _ensure_capacity(self, rows: int):
+        capacity = 0 if self.matrix is None else self.matrix.shape[0]
+        if rows <= capacity:
+            return
+
+        new_capacity = max(rows, capacity * 2, 1024)
+        tmp_path = self.path + ".tmp"
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float16, shape=(new_capacity, self.dim))
+        if self.matrix is not None:
+            grown[:len(self.ids)] = self.matrix[:len(self.ids)]
+            del self.matrix
+        grown.flush()
+        del grown
+        os.replace(tmp_path, self.path)
+        self.matrix = np.load(self.path, mmap_mode="r+")
+
+    def clear(self):
+        """Drop every vector, e.g. before re-embedding a compacted store"""
+        self.ids = []
+        self.rows = {}
+        self.doc_freq = np.zeros(self.dim, dtype=np.int64)
+        self.doc_count = 0
+        self.matrix = None
+        self.buckets = [{} for _ in range(self.tables)]
+        for path in (self.path, self.meta_path, self.ids_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def move_to(self, path: str):
+        """Replace the index stored at path with this one, e.g. to swap in a rebuilt index.
+
+        The metadata is moved last, so a crash part-way leaves ids that disagree
+        with the metadata count and the next load rebuilds instead of mixing rows.
+        """
+        target_path, target_meta_path, target_ids_path = _index_paths(path)
+        if os.path.exists(target_meta_path):
+            os.remove(target_meta_path)
+        # The open memmap follows the file across the rename. An index that never
+        # got a row has no matrix or ids file, and replaces the target's with none.
+        for source, destination in ((self.path, target_path), (self.ids_path, target_ids_path),
+                                    (self.meta_path, target_meta_path)):
+            if os.path.exists(source):
+                os.replace(source, destination)
+            elif os.path.exists(destination):
+                os.remove(destination)
+        self.path, self.meta_path, self.ids_path = target_path, target_meta_path, target_ids_path
+
+    def _codes(self, vectors: np.ndarray) -> np.ndarray:
+        projections = (vectors @ self.planes) > 0
+        projections = projections.reshape(len(vectors), self.tables, self.bits)
+        return projections @ self.bit_weights
+
+    def _add_to_buckets(self, start: int, vectors: np.ndarray):
+        for offset, codes in enumerate(self._codes(vectors)):
+            for table, code in enumerate(codes.tolist()):
+                self.buckets[table].setdefault(code, []).append(start + offset)
+
+    def _weight(self, tf: np.ndarray) -> np.ndarray:
+        idf = np.log((1.0 + self.doc_count) / (1.0 + self.doc_freq)).astype(np.float32) + 1.0
+        vectors = tf * idf
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def add_batch(self, items: List[Tuple[str, str, Optional[str], List[str]]]):
+        """Embed and append a batch of (content_id, title, content_text, tags); call flush() when done"""
+        items = [item for item in items if item[0] not in self.rows]
+        if not items:
+            return
+
+        tf = self.vectorizer.transform([(title, content_text, tags) for _, title, content_text, tags in items])
+        self.doc_freq += (tf != 0).sum(axis=0)
+        self.doc_count += len(items)
+        vectors = self._weight(tf).astype(np.float16)
+
+        start = len(self.ids)
+        self._ensure_capacity(start + len(items))
+        self.matrix[start:start + len(items)] = vectors
+
+        for offset, (content_id, _, _, _) in enumerate(items):
+            self.ids.append(content_id)
+            self.rows[content_id] = start + offset
+        with open(self.ids_path, "a") as f:
+            f.write("".join(f"{content_id}\n" for content_id, _, _, _ in items))
+        self._add_to_buckets(start, vectors.astype(np.float32))
+
+    def similar(self, content_id: str, k: int = 10,
+                include: Optional[Callable[[str], bool]] = None) -> List[Tuple[str, float]]:
+        """Return up to k (content_id, cosine similarity) pairs most similar to an indexed item.
+
+        ``include`` filters ids before the top k are picked, so rows of items that
+        left the store do not take up result slots.
+        """
+        row = self.rows.get(content_id)
+        if row is None:
+            return []
+
+        query = np.asarray(self.matrix[row], dtype=np.float32)
+        candidates = set()
+        for table, code in enumerate(self._codes(query[None, :])[0].tolist()):
+            candidates.update(self.buckets[table].get(code, []))
+        candidates.discard(row)
+        if include is not None:
+            candidates = {candidate for candidate in candidates if include(self.ids[candidate])}
+
+        if len(candidates) < k:
+            if include is None:
+                candidate_rows = np.arange(len(self.ids))
+            else:
+                candidate_rows = np.array([candidate for candidate, candidate_id in enumerate(self.ids) if include(candidate_id)],
+                                          dtype=np.int64)
+        else:
+            candidate_rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            candidate_rows.sort()
+
+        scores = np.asarray(self.matrix[candidate_rows], dtype=np.float32) @ query
+        scores[candidate_rows == row] = -np.inf
+        top = min(k, len(candidate_rows))
+        if top <= 0:
+            return []
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+
+        return [(self.ids[candidate_rows[i]], float(scores[i])) for i in best if np.isfinite(scores[i])]
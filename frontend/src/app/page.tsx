@@ -1,6 +1,6 @@
 'use client';
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 
 interface EngagementMetrics {
   views?: number;
@@ -28,6 +28,40 @@ interface ContentItem {
   thumbnail_url?: string;
 }
 
+interface ContentDelta {
+  cursor: string;
+  version: number;
+  added: ContentItem[];
+  updated: ContentItem[];
+  removed: string[];
+}
+
+// Merge a change-stream delta into the loaded list, keeping it sorted by viral score
+const applyContentDelta = (
+  items: ContentItem[],
+  delta: ContentDelta,
+  matches: (item: ContentItem) => boolean,
+  allowNew: boolean
+): ContentItem[] => {
+  const removed = new Set(delta.removed);
+  const updated = new Map(delta.updated.map(item => [item.id, item]));
+  const merged = items
+    .filter(item => !removed.has(item.id))
+    .map(item => updated.get(item.id) ?? item)
+    .filter(item => !updated.has(item.id) || matches(item));
+
+  if (allowNew) {
+    const known = new Set(merged.map(item => item.id));
+    for (const item of [...delta.added, ...delta.updated]) {
+      if (!known.has(item.id) && matches(item)) {
+        merged.push(item);
+        known.add(item.id);
+      }
+    }
+  }
+  return merged.sort((a, b) => b.viral_score - a.viral_score);
+};
+
 interface Stats {
   total_content: number;
   total_analyses: number;
@@ -38,6 +72,7 @@ interface Stats {
 
 export default function Home() {
   const [content, setContent] = useState<ContentItem[]>([]);
+  const [contentCursor, setContentCursor] = useState<string | null>(null);
   const [stats, setStats] = useState<Stats | null>(null);
   const [loading, setLoading] = useState(true);
   const [selectedPlatform, setSelectedPlatform] = useState<string>('all');
@@ -87,6 +122,8 @@ export default function Home() {
       if (response.ok) {
         const data = await response.json();
         setContent(data);
+        // Change stream resumes from the version this list was built at
+        setContentCursor(response.headers.get('X-Content-Cursor'));
       }
     } catch (error) {
       console.error('Failed to fetch content:', error);
@@ -96,14 +133,14 @@ export default function Home() {
 
   const fetchStats = async () => {
     try {
-      // Mock stats for now since we don't have a stats endpoint yet
-      setStats({
-        total_content: content.length,
-        total_analyses: 0,
-        total_briefs: 0,
-        platform_distribution: {},
-        last_updated: new Date().toISOString()
-      });
+      const response = await fetch(`${api_url}/stats`);
+      if (response.ok) {
+        const data = await response.json();
+        setStats({
+          ...data,
+          last_updated: data.last_updated || new Date().toISOString()
+        });
+      }
     } catch (error) {
       console.error('Failed to fetch stats:', error);
     }
@@ -147,11 +184,7 @@ export default function Home() {
       if (response.ok) {
         const result = await response.json();
         alert(`Successfully scraped ${result.content_count} contents!`);
-        // Refresh content after scraping
-        setTimeout(() => {
-          fetchContent();
-          fetchStats();
-        }, 1000);
+        // New content arrives through the change stream
       } else {
         const error = await response.json();
         alert(`Scraping failed: ${error.detail}`);
@@ -262,6 +295,37 @@ export default function Home() {
     loadData();
   }, [selectedPlatform, minViralScore]);
 
+  // Read by the change stream handlers without reconnecting on every keystroke
+  const filtersRef = useRef({ selectedPlatform, minViralScore, searchQuery });
+  filtersRef.current = { selectedPlatform, minViralScore, searchQuery };
+
+  useEffect(() => {
+    if (!contentCursor) {
+      return;
+    }
+
+    // EventSource resends the last delivered cursor when it reconnects
+    const source = new EventSource(`${api_url}/content/stream?since=${encodeURIComponent(contentCursor)}`);
+
+    source.addEventListener('delta', (event) => {
+      const delta: ContentDelta = JSON.parse((event as MessageEvent).data);
+      const { selectedPlatform, minViralScore, searchQuery } = filtersRef.current;
+      const matches = (item: ContentItem) =>
+        (selectedPlatform === 'all' || item.platform === selectedPlatform) && item.viral_score >= minViralScore;
+      // Search results only follow updates and removals of what they already show
+      setContent(prev => applyContentDelta(prev, delta, matches, !searchQuery.trim()));
+      fetchStats();
+    });
+
+    source.addEventListener('reset', () => {
+      // Missed changes are no longer available, so reload the list and resume from its cursor
+      fetchContent();
+      fetchStats();
+    });
+
+    return () => source.close();
+  }, [contentCursor, selectedPlatform, minViralScore]);
+
   const formatEngagement = (metrics: EngagementMetrics, platform: string) => {
     if (platform === 'reddit') {
       return `↑ ${metrics.upvotes || 0} | 💬 ${metrics.comments || 0}`;